@@ -0,0 +1,536 @@
+"""Load-test every API blueprint against a seeded local database.
+
+    python benchmark.py --database-url sqlite:////tmp/bench.db --scale 0.01
+    python benchmark.py --database-url postgresql://localhost/bench --save-baseline
+    python benchmark.py --database-url postgresql://localhost/bench   # fails on regressions
+
+The app runs in-process and is driven through Flask test clients from a thread
+pool, so the numbers cover routing, auth, SQL and serialization but not the
+network or the WSGI server. Firebase is stubbed: a token "bench:<uid>" verifies
+as that user, and "bench:bench-0" is the admin.
+
+Default sizes are 10k vehicles, 100k users and 1M bookings; --scale shrinks
+or grows all three. Seeding is skipped when the database already holds the
+requested number of vehicles (--reseed forces it). For Postgres, run
+`flask db upgrade` first so the migration-only constraints exist.
+
+--db-latency-ms delays every statement to mimic a remote Postgres; with
+--concurrency 1 vs --concurrency 8 it shows how much a threaded worker
+(see gunicorn.conf.py) overlaps that waiting.
+
+--contention N races N simultaneous POST /api/bookings/ calls for the same
+vehicle and dates and fails unless exactly one succeeds and the rest get 409.
+Run it against Postgres: SQLite has no row locks, so SELECT ... FOR UPDATE
+does not serialize the availability check there.
+
+Micro-benchmarks ("micro: ..." rows) time in-process code paths such as the
+serializers directly, one call per iteration, without HTTP.
+
+Results are compared route by route with the --baseline file: a p95 more than
+--tolerance above the baseline (and at least --noise-ms slower) or an RPS more
+than --tolerance below it fails the run with exit status 1. So does any error
+response, baseline or not, and --save-baseline refuses to record a run with errors.
+"""
+import os
+
+# The benchmark builds its own app from --database-url; importing app also
+# builds the module-level one, which outside development needs DATABASE_URL
+os.environ.setdefault('APP_ENV', 'development')
+
+from app import create_app  # noqa: E402
+from models import db, User, Category, Vehicle, Booking
+from sqlalchemy import event, func, insert
+from views.availability import active_overlap, free_vehicle_ids, is_vehicle_free
+from views.booking import MAX_BOOKING_BATCH
+from views.serializers import booking_detail_serializer, dumps
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, datetime, timedelta
+import argparse
+import itertools
+import json
+import logging
+import random
+import sys
+import threading
+import time
+import uuid
+
+DEFAULT_VEHICLES = 10000
+DEFAULT_USERS = 100000
+DEFAULT_BOOKINGS = 1000000
+SEED_CHUNK_SIZE = 10000
+
+CATEGORIES = ["SUV", "Sedan", "Van", "Truck", "Convertible", "Pickup", "Minibus", "Hatchback"]
+STATUSES = ['confirmed', 'confirmed', 'completed', 'completed', 'pending', 'cancelled']
+
+# Seeded bookings live in the past; bookings created by a run start after the
+# latest stored booking so they never collide with seeded or earlier runs' ones
+SEED_START = date(2020, 1, 1)
+BOOKING_DAYS = 3
+
+ADMIN_UID = 'bench-0'
+
+
+def bench_uid(index):
+    return f'bench-{index}'
+
+
+def stub_verify_firebase_token(id_token):
+    if not id_token or not id_token.startswith('bench:'):
+        return None
+    uid = id_token.split(':', 1)[1]
+    return {
+        'uid': uid,
+        'email': f'{uid}@bench.local',
+        'name': uid,
+        'admin': uid == ADMIN_UID,
+        'exp': time.time() + 3600
+    }
+
+
+def install_firebase_stub():
+    # Every module that imported verify_firebase_token holds its own reference
+    for module in list(sys.modules.values()):
+        name = getattr(module, '__name__', '') or ''
+        if (name.startswith('views.') or name == 'app') and hasattr(module, 'verify_firebase_token'):
+            module.verify_firebase_token = stub_verify_firebase_token
+
+
+def inject_db_latency(app, milliseconds):
+    """Sleep before every SQL statement, standing in for a remote database round-trip."""
+    delay = milliseconds / 1000
+
+    def delay_statement(conn, cursor, statement, parameters, context, executemany):
+        time.sleep(delay)
+
+    with app.app_context():
+        event.listen(db.engine, 'before_cursor_execute', delay_statement)
+
+
+def seed(app, vehicles, users, bookings, reseed=False):
+    with app.app_context():
+        if reseed:
+            db.drop_all()
+        db.create_all()
+        if not reseed and db.session.query(func.count(Vehicle.id)).scalar() >= vehicles:
+            print(f"ℹ Reusing seeded data ({vehicles} vehicles requested).")
+            return
+
+        started = time.perf_counter()
+        rng = random.Random(42)
+
+        db.session.execute(insert(Category), [{'name': name} for name in CATEGORIES])
+        category_ids = [row.id for row in db.session.query(Category.id)]
+
+        rows = ({
+            'firebase_uid': bench_uid(i),
+            'name': f'Bench User {i}',
+            'email': f'{bench_uid(i)}@bench.local',
+            'is_admin': i == 0
+        } for i in range(users))
+        insert_chunks(User, rows)
+
+        rows = ({
+            'name': f'Vehicle {i}',
+            'description': 'Synthetic benchmark vehicle.',
+            'price': float(rng.randrange(3000, 20000, 500)),
+            'availability': rng.random() > 0.1,
+            'category_id': rng.choice(category_ids),
+            'seats': rng.choice([2, 4, 5, 7, 14])
+        } for i in range(vehicles))
+        insert_chunks(Vehicle, rows)
+
+        user_ids = [row.id for row in db.session.query(User.id)]
+        vehicle_ids = [row.id for row in db.session.query(Vehicle.id)]
+        insert_chunks(Booking, booking_rows(rng, bookings, vehicle_ids, user_ids))
+        db.session.commit()
+        print(f"✔ Seeded {users} users, {vehicles} vehicles, {bookings} bookings "
+              f"in {time.perf_counter() - started:.1f}s.")
+
+
+def booking_rows(rng, count, vehicle_ids, user_ids):
+    # Consecutive, non-overlapping slots per vehicle, round-robin over vehicles
+    for i in range(count):
+        vehicle_id = vehicle_ids[i % len(vehicle_ids)]
+        start = SEED_START + timedelta(days=(i // len(vehicle_ids)) * BOOKING_DAYS)
+        yield {
+            'user_id': rng.choice(user_ids),
+            'vehicle_id': vehicle_id,
+            'start_date': start,
+            'end_date': start + timedelta(days=BOOKING_DAYS - 1),
+            'total_price': float(rng.randrange(9000, 60000, 500)),
+            'full_name': 'Bench Customer',
+            'phone': '0700000000',
+            'email': 'customer@bench.local',
+            'id_number': '00000000',
+            'driving_license': 'DL-000000',
+            'pickup_option': 'pickup',
+            'payment_method': 'mpesa',
+            'booking_status': rng.choice(STATUSES),
+            'created_at': datetime(2020, 1, 1) + timedelta(minutes=i)
+        }
+
+
+def insert_chunks(model, rows):
+    rows = iter(rows)
+    while True:
+        chunk = list(itertools.islice(rows, SEED_CHUNK_SIZE))
+        if not chunk:
+            break
+        db.session.execute(insert(model), chunk)
+
+
+class Bench:
+    """Shared state for scenarios: entity ids, a write counter and a per-thread client."""
+
+    def __init__(self, app, users, vehicles):
+        self.app = app
+        self.users = users
+        self.vehicles = vehicles
+        self._counter = itertools.count()
+        self._counter_lock = threading.Lock()
+        self._local = threading.local()
+        self.run_id = uuid.uuid4().hex[:8]
+        with app.app_context():
+            last_end = db.session.query(func.max(Booking.end_date)).scalar() or date.today()
+            self.write_start = max(last_end, date.today()) + timedelta(days=1)
+            self.booking_ids = [row.id for row in db.session.query(Booking.id).order_by(func.random()).limit(1000)]
+            self.category_ids = [row.id for row in db.session.query(Category.id)]
+            self.available_vehicle_ids = [row.id for row in db.session.query(Vehicle.id).filter(Vehicle.availability.is_(True))]
+
+    @property
+    def client(self):
+        if not hasattr(self._local, 'client'):
+            self._local.client = self.app.test_client()
+        return self._local.client
+
+    def next(self):
+        with self._counter_lock:
+            return next(self._counter)
+
+    def unique(self, prefix):
+        return f'{prefix} {self.run_id}-{self.next()}'
+
+    def user_token(self):
+        return f'bench:{bench_uid(random.randrange(1, self.users))}'
+
+    def admin_token(self):
+        return f'bench:{ADMIN_UID}'
+
+    def vehicle_id(self):
+        return random.randrange(1, self.vehicles + 1)
+
+    def free_slot(self):
+        # Each call gets its own (vehicle, dates) slot after the stored bookings
+        n = self.next()
+        vehicle_ids = self.available_vehicle_ids
+        start = self.write_start + timedelta(days=(n // len(vehicle_ids)) * BOOKING_DAYS)
+        return vehicle_ids[n % len(vehicle_ids)], start, start + timedelta(days=BOOKING_DAYS - 1)
+
+    def booking_payload(self):
+        vehicle_id, start, end = self.free_slot()
+        return {
+            'vehicle_id': vehicle_id,
+            'start_date': start.isoformat(),
+            'end_date': end.isoformat(),
+            'full_name': 'Bench Customer',
+            'phone': '0700000000',
+            'email': 'customer@bench.local',
+            'id_number': '00000000',
+            'driving_license': 'DL-000000',
+            'pickup_option': 'pickup',
+            'payment_method': 'mpesa'
+        }
+
+    def insert_row(self, model, **values):
+        # Untimed setup for routes that consume an entity (cancel, delete)
+        with self.app.app_context():
+            row_id = db.session.execute(insert(model).values(**values).returning(model.id)).scalar()
+            db.session.commit()
+            return row_id
+
+
+def future_booking(bench, token):
+    uid = token.split(':', 1)[1]
+    vehicle_id, start, end = bench.free_slot()
+    with bench.app.app_context():
+        user_id = db.session.query(User.id).filter_by(firebase_uid=uid).scalar()
+    payload = bench.booking_payload()
+    del payload['vehicle_id'], payload['start_date'], payload['end_date']
+    return bench.insert_row(Booking, user_id=user_id, vehicle_id=vehicle_id, start_date=start, end_date=end,
+                            total_price=9000.0, booking_status='confirmed', created_at=datetime.utcnow(), **payload)
+
+
+def scenarios(bench):
+    """Route name -> callable returning (method, path, json body or None, token or None)."""
+    today = date.today()
+    window = (today + timedelta(days=30)).isoformat(), (today + timedelta(days=33)).isoformat()
+
+    def cancel():
+        token = bench.user_token()
+        return 'PATCH', f'/api/bookings/{future_booking(bench, token)}/cancel', None, token
+
+    return {
+        # auth_bp
+        'POST /auth/verify_token': lambda: ('POST', '/auth/verify_token', {'token': bench.user_token()}, None),
+        'GET /auth/current_user': lambda: ('GET', '/auth/current_user', None, bench.user_token()),
+        # user_bp
+        'GET /users/me': lambda: ('GET', '/users/me', None, bench.user_token()),
+        'PATCH /users/me': lambda: ('PATCH', '/users/me', {'name': bench.unique('Renamed')}, bench.user_token()),
+        'GET /users/': lambda: ('GET', '/users/', None, bench.admin_token()),
+        'DELETE /users/<id>': lambda: (
+            'DELETE', f'/users/{bench.insert_row(User, name="Doomed", email=f"doomed-{bench.run_id}-{bench.next()}@bench.local")}',
+            None, bench.admin_token()),
+        # category_bp
+        'GET /categories/': lambda: ('GET', '/categories/', None, None),
+        'POST /categories/': lambda: ('POST', '/categories/', {'name': bench.unique('Category')}, bench.admin_token()),
+        'PATCH /categories/<id>': lambda: (
+            'PATCH', f'/categories/{bench.insert_row(Category, name=bench.unique("Temp"))}',
+            {'name': bench.unique('Renamed')}, bench.admin_token()),
+        'DELETE /categories/<id>': lambda: (
+            'DELETE', f'/categories/{bench.insert_row(Category, name=bench.unique("Doomed"))}',
+            None, bench.admin_token()),
+        # vehicle_bp
+        'GET /vehicles/': lambda: ('GET', '/vehicles/?limit=50', None, None),
+        'GET /vehicles/ (filtered)': lambda: (
+            'GET', f'/vehicles/?category=suv&available=true&max_price=12000'
+                   f'&start_date={window[0]}&end_date={window[1]}&limit=50', None, None),
+        'GET /vehicles/<id>': lambda: ('GET', f'/vehicles/{bench.vehicle_id()}', None, None),
+        'POST /vehicles/': lambda: ('POST', '/vehicles/', {
+            'name': bench.unique('New'), 'description': 'Added by benchmark.', 'price': 8000.0,
+            'category_id': random.choice(bench.category_ids)}, bench.admin_token()),
+        'PATCH /vehicles/<id>': lambda: (
+            'PATCH', f'/vehicles/{bench.vehicle_id()}', {'price': float(random.randrange(3000, 20000, 500))},
+            bench.admin_token()),
+        'DELETE /vehicles/<id>': lambda: (
+            'DELETE', f'/vehicles/{bench.insert_row(Vehicle, name="Doomed", description="-", price=1.0, category_id=bench.category_ids[0])}',
+            None, bench.admin_token()),
+        # booking_bp
+        'POST /api/bookings/': lambda: ('POST', '/api/bookings/', bench.booking_payload(), bench.user_token()),
+        'POST /api/bookings/batch': lambda: (
+            'POST', '/api/bookings/batch', {'bookings': [bench.booking_payload() for _ in range(20)]},
+            bench.user_token()),
+        # Largest accepted batch; bookings/s is rps * MAX_BOOKING_BATCH
+        'POST /api/bookings/batch (max)': lambda: (
+            'POST', '/api/bookings/batch', {'bookings': [bench.booking_payload() for _ in range(MAX_BOOKING_BATCH)]},
+            bench.user_token()),
+        'POST /api/bookings/quote': lambda: (
+            'POST', '/api/bookings/quote', {'vehicle_ids': [bench.vehicle_id() for _ in range(50)],
+                                            'start_date': window[0], 'end_date': window[1]}, None),
+        'GET /api/bookings/my': lambda: ('GET', '/api/bookings/my', None, bench.user_token()),
+        'PATCH /api/bookings/<id>/cancel': cancel,
+        'GET /api/bookings/': lambda: ('GET', '/api/bookings/?limit=100&status=confirmed', None, bench.admin_token()),
+        'GET /api/bookings/export': lambda: (
+            'GET', f'/api/bookings/export?format=csv&user_id={random.randrange(1, bench.users)}', None,
+            bench.admin_token()),
+        'GET /api/bookings/<id>': lambda: (
+            'GET', f'/api/bookings/{random.choice(bench.booking_ids)}', None, bench.admin_token()),
+        'PATCH /api/bookings/<id>/status': lambda: (
+            'PATCH', f'/api/bookings/{random.choice(bench.booking_ids)}/status', {'status': 'completed'},
+            bench.admin_token()),
+    }
+
+
+def run_scenario(bench, build, requests, concurrency):
+    def one(_):
+        method, path, body, token = build()
+        headers = {'Authorization': f'Bearer {token}'} if token else {}
+        started = time.perf_counter()
+        response = bench.client.open(path, method=method, json=body, headers=headers)
+        response.get_data()  # drain streamed bodies
+        elapsed = time.perf_counter() - started
+        return elapsed, response.status_code
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        results = list(pool.map(one, range(requests)))
+    wall = time.perf_counter() - started
+
+    latencies = sorted(elapsed for elapsed, _ in results)
+    errors = sum(1 for _, status in results if status >= 400)
+    return {
+        'requests': requests,
+        'errors': errors,
+        'p50_ms': percentile(latencies, 50) * 1000,
+        'p95_ms': percentile(latencies, 95) * 1000,
+        'p99_ms': percentile(latencies, 99) * 1000,
+        'rps': requests / wall if wall else 0.0
+    }
+
+
+def run_contention(bench, attempts, rounds):
+    """Race `attempts` bookings of one vehicle for the same dates, `rounds` times.
+
+    Each round must end with exactly one 201, the rest 409, and exactly one
+    stored booking; returns the number of rounds that did not.
+    """
+    failures = 0
+    for round_number in range(1, rounds + 1):
+        payload = bench.booking_payload()
+        barrier = threading.Barrier(attempts)
+
+        def attempt(i):
+            client = bench.app.test_client()
+            headers = {'Authorization': f'Bearer bench:{bench_uid(1 + i % (bench.users - 1))}'}
+            barrier.wait()  # release every request at once
+            return client.post('/api/bookings/', json=payload, headers=headers).status_code
+
+        with ThreadPoolExecutor(max_workers=attempts) as pool:
+            statuses = list(pool.map(attempt, range(attempts)))
+        with bench.app.app_context():
+            stored = db.session.query(func.count(Booking.id)).filter(
+                Booking.vehicle_id == payload['vehicle_id'],
+                active_overlap(date.fromisoformat(payload['start_date']), date.fromisoformat(payload['end_date']))
+            ).scalar()
+
+        created, conflicts = statuses.count(201), statuses.count(409)
+        passed = created == 1 and conflicts == attempts - 1 and stored == 1
+        failures += not passed
+        print(f"{'✔' if passed else '✘'} round {round_number}: {created} created, {conflicts} conflicts, "
+              f"{attempts - created - conflicts} other, {stored} stored")
+    return failures
+
+
+def micro_scenarios(bench):
+    """In-process code paths timed without HTTP: name -> callable timed once per iteration."""
+    with bench.app.app_context():
+        detail_rows = db.session.query(*booking_detail_serializer.columns) \
+            .join(Vehicle, Booking.vehicle_id == Vehicle.id).filter(Booking.id.in_(bench.booking_ids)).all()
+
+    def seeded_window():
+        # Three days somewhere in the seeded history, where every vehicle has bookings to skip past
+        start = SEED_START + timedelta(days=random.randrange(max((bench.write_start - SEED_START).days, 1)))
+        return start, start + timedelta(days=2)
+
+    return {
+        'micro: is_vehicle_free': lambda: is_vehicle_free(bench.vehicle_id(), *seeded_window()),
+        'micro: free_vehicle_ids sweep': lambda: free_vehicle_ids(*seeded_window()),
+        # get_booking's response shape for up to 1000 stored bookings: compiled serializer plus dumps
+        'micro: serialize booking details': lambda: dumps(booking_detail_serializer.many(detail_rows)),
+    }
+
+
+def run_micro(bench, fn, iterations):
+    latencies = []
+    with bench.app.app_context():
+        for _ in range(iterations):
+            started = time.perf_counter()
+            fn()
+            latencies.append(time.perf_counter() - started)
+    latencies.sort()
+    total = sum(latencies)
+    return {
+        'requests': iterations,
+        'errors': 0,
+        'p50_ms': percentile(latencies, 50) * 1000,
+        'p95_ms': percentile(latencies, 95) * 1000,
+        'p99_ms': percentile(latencies, 99) * 1000,
+        'rps': iterations / total if total else 0.0
+    }
+
+
+def percentile(values, pct):
+    if not values:
+        return 0.0
+    index = min(len(values) - 1, max(0, round(pct / 100 * len(values)) - 1))
+    return values[index]
+
+
+def compare(results, baseline, tolerance, noise_ms):
+    regressions = []
+    for name, result in results.items():
+        base = baseline.get(name)
+        # Every scenario is built to succeed, so an error response fails the run
+        # even when the baseline recorded errors too (or has no entry at all)
+        if result['errors']:
+            base_errors = base.get('errors', 0) if base else 0
+            regressions.append(f"{name}: {result['errors']} error responses vs baseline {base_errors}")
+        if not base:
+            continue
+        p95_limit = base['p95_ms'] * (1 + tolerance)
+        if result['p95_ms'] > p95_limit and result['p95_ms'] - base['p95_ms'] >= noise_ms:
+            regressions.append(f"{name}: p95 {result['p95_ms']:.1f} ms vs baseline {base['p95_ms']:.1f} ms")
+        if result['rps'] < base['rps'] * (1 - tolerance):
+            regressions.append(f"{name}: {result['rps']:.0f} rps vs baseline {base['rps']:.0f} rps")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--database-url', default='sqlite:////tmp/car_rental_bench.db')
+    parser.add_argument('--scale', type=float, default=1.0, help='multiplier for the default data sizes')
+    parser.add_argument('--reseed', action='store_true')
+    parser.add_argument('--requests', type=int, default=200, help='requests per route')
+    parser.add_argument('--concurrency', type=int, default=8)
+    parser.add_argument('--routes', help='only run routes whose name contains this text')
+    parser.add_argument('--baseline', default='benchmark_baseline.json')
+    parser.add_argument('--save-baseline', action='store_true', help='write results as the new baseline')
+    parser.add_argument('--tolerance', type=float, default=0.2, help='allowed relative slowdown')
+    parser.add_argument('--noise-ms', type=float, default=2.0, help='ignore p95 slowdowns smaller than this')
+    parser.add_argument('--db-latency-ms', type=float, default=0,
+                        help='added to every SQL statement after seeding, to compare worker concurrency modes')
+    parser.add_argument('--contention', type=int, metavar='N',
+                        help='instead of timing routes, race N simultaneous bookings of the same vehicle and dates')
+    parser.add_argument('--contention-rounds', type=int, default=10)
+    parser.add_argument('--verbose', action='store_true', help='keep app logging (slow queries, tracebacks)')
+    args = parser.parse_args()
+    if not args.verbose:
+        logging.disable(logging.ERROR)
+
+    vehicles = max(1, int(DEFAULT_VEHICLES * args.scale))
+    users = max(2, int(DEFAULT_USERS * args.scale))
+    bookings = int(DEFAULT_BOOKINGS * args.scale)
+
+    app = create_app({'SQLALCHEMY_DATABASE_URI': args.database_url})
+    install_firebase_stub()
+    seed(app, vehicles, users, bookings, reseed=args.reseed)
+
+    bench = Bench(app, users, vehicles)
+    if args.db_latency_ms:
+        inject_db_latency(app, args.db_latency_ms)
+
+    if args.contention:
+        failures = run_contention(bench, args.contention, args.contention_rounds)
+        print("✔ No double bookings." if not failures else f"✘ {failures} round(s) double-booked or errored.")
+        return 1 if failures else 0
+
+    results = {}
+    print(f"{'route':<36} {'reqs':>5} {'errs':>5} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} {'rps':>8}")
+
+    def report(name, result):
+        results[name] = result
+        print(f"{name:<36} {result['requests']:>5} {result['errors']:>5} {result['p50_ms']:>8.1f} "
+              f"{result['p95_ms']:>8.1f} {result['p99_ms']:>8.1f} {result['rps']:>8.0f}")
+
+    for name, build in scenarios(bench).items():
+        if not args.routes or args.routes in name:
+            report(name, run_scenario(bench, build, args.requests, args.concurrency))
+    for name, fn in micro_scenarios(bench).items():
+        if not args.routes or args.routes in name:
+            report(name, run_micro(bench, fn, args.requests))
+
+    baseline = {}
+    if not args.save_baseline:
+        try:
+            with open(args.baseline) as f:
+                baseline = json.load(f)
+        except FileNotFoundError:
+            print(f"ℹ No baseline at {args.baseline}; run with --save-baseline to create one.")
+
+    regressions = compare(results, baseline, args.tolerance, args.noise_ms)
+    if args.save_baseline and not regressions:
+        with open(args.baseline, 'w') as f:
+            json.dump(results, f, indent=2, sort_keys=True)
+        print(f"✔ Baseline written to {args.baseline}.")
+        return 0
+    for regression in regressions:
+        print(f"✘ {regression}")
+    if args.save_baseline and regressions:
+        print("✘ Baseline not written: fix the errors first.")
+    elif not regressions and baseline:
+        print("✔ No regressions against baseline.")
+    return 1 if regressions else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
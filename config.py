@@ -0,0 +1,106 @@
+import os
+from dotenv import load_dotenv
+from db_pool import InstrumentedQueuePool
+
+load_dotenv()
+
+# APP_ENV=development or testing falls back to a local SQLite file (placed in
+# instance/ by Flask-SQLAlchemy) when DATABASE_URL is not set. Any other
+# environment, production included, refuses to start without DATABASE_URL.
+APP_ENV = os.getenv('APP_ENV', 'production')
+LOCAL_ENVS = ('development', 'testing')
+DEFAULT_DATABASE_URL = "sqlite:///app.db"
+
+
+def env_bool(name, default=False):
+    value = os.getenv(name)
+    if value is None:
+        return default
+    return value.strip().lower() in ('1', 'true', 'yes', 'on')
+
+
+def env_int(name, default):
+    value = os.getenv(name)
+    return int(value) if value not in (None, '') else default
+
+
+def database_url():
+    """DATABASE_URL normalised for SQLAlchemy; None when unset outside development/testing."""
+    url = os.getenv('DATABASE_URL')
+    if not url:
+        return DEFAULT_DATABASE_URL if APP_ENV in LOCAL_ENVS else None
+    # Render/Heroku hand out postgres:// URLs, which SQLAlchemy no longer accepts
+    if url.startswith('postgres://'):
+        url = 'postgresql://' + url[len('postgres://'):]
+    return url
+
+
+def engine_options(url):
+    """SQLAlchemy engine options for `url`, tuned through DB_* environment variables.
+
+    DB_POOL_SIZE, DB_MAX_OVERFLOW, DB_POOL_TIMEOUT and DB_POOL_RECYCLE (seconds)
+    size the per-process pool, DB_POOL_PRE_PING tests connections before use and
+    DB_STATEMENT_TIMEOUT_MS caps statement runtime and DB_LOCK_TIMEOUT_MS caps
+    waits on row locks such as a contended booking (0 disables either).
+    DB_PGBOUNCER=true leaves pooling to PgBouncer in transaction mode: no
+    client-side pool and no startup parameters, which PgBouncer rejects; set
+    statement_timeout and lock_timeout on the database role instead.
+    Migrations lift statement_timeout for their own transaction (see
+    migrations/env.py; MIGRATION_STATEMENT_TIMEOUT_MS sets one).
+
+    Bound parameters carry customer details, so they are always kept out of
+    SQLAlchemy's error messages and logs (hide_parameters).
+    """
+    if not url or url.startswith('sqlite'):
+        return {'hide_parameters': True}
+
+    if env_bool('DB_PGBOUNCER'):
+        from sqlalchemy.pool import NullPool
+        return {'poolclass': NullPool, 'hide_parameters': True}
+
+    statement_timeout = env_int('DB_STATEMENT_TIMEOUT_MS', 30000)
+    lock_timeout = env_int('DB_LOCK_TIMEOUT_MS', 5000)
+    options = {
+        'poolclass': InstrumentedQueuePool,
+        'pool_size': env_int('DB_POOL_SIZE', 5),
+        'max_overflow': env_int('DB_MAX_OVERFLOW', 10),
+        'pool_timeout': env_int('DB_POOL_TIMEOUT', 30),
+        'pool_recycle': env_int('DB_POOL_RECYCLE', 1800),
+        'pool_pre_ping': env_bool('DB_POOL_PRE_PING', True),
+        'hide_parameters': True
+    }
+    if url.startswith('postgresql'):
+        settings = []
+        if statement_timeout:
+            settings.append(f'-c statement_timeout={statement_timeout}')
+        if lock_timeout:
+            settings.append(f'-c lock_timeout={lock_timeout}')
+        if settings:
+            options['connect_args'] = {'options': ' '.join(settings)}
+    return options
+
+
+class Config:
+    SQLALCHEMY_DATABASE_URI = database_url()
+    SQLALCHEMY_TRACK_MODIFICATIONS = False
+    SQLALCHEMY_ENGINE_OPTIONS = engine_options(SQLALCHEMY_DATABASE_URI)
+
+    # Shared cache backend: 'memory' (per worker), 'local' (in-process stand-in
+    # for a shared store, used in tests) or 'redis' (needs CACHE_REDIS_URL)
+    CACHE_BACKEND = os.getenv('CACHE_BACKEND', 'memory')
+    CACHE_REDIS_URL = os.getenv('CACHE_REDIS_URL')
+    CACHE_MAX_ENTRIES = env_int('CACHE_MAX_ENTRIES', 10000)
+    CATALOG_CACHE_TTL = env_int('CATALOG_CACHE_TTL', 300)
+
+    # Response compression: bodies smaller than this many bytes are sent as-is
+    COMPRESS_MIN_SIZE = env_int('COMPRESS_MIN_SIZE', 1024)
+    COMPRESS_LEVEL = env_int('COMPRESS_LEVEL', 6)
+
+    # SQL statements slower than this are logged (text only, parameters redacted)
+    SLOW_QUERY_MS = env_int('SLOW_QUERY_MS', 500)
+
+    # /metrics is only served to callers sending METRICS_TOKEN as a Bearer token
+    # or connecting from METRICS_ALLOWED_IPS (comma-separated addresses or CIDR
+    # ranges); with neither set it answers 404 to everyone
+    METRICS_TOKEN = os.getenv('METRICS_TOKEN')
+    METRICS_ALLOWED_IPS = os.getenv('METRICS_ALLOWED_IPS', '')
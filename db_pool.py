@@ -0,0 +1,54 @@
+from sqlalchemy.pool import QueuePool
+import threading
+import time
+
+# Kept outside views/ so config.py can name the pool class without importing a blueprint
+
+
+class InstrumentedQueuePool(QueuePool):
+    """QueuePool that records how long callers wait to check out a connection."""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.wait_stats = {'checkouts': 0, 'wait_seconds_total': 0.0, 'wait_seconds_max': 0.0, 'timeouts': 0}
+        self._stats_lock = threading.Lock()
+
+    def _do_get(self):
+        started = time.perf_counter()
+        try:
+            return super()._do_get()
+        except Exception:
+            with self._stats_lock:
+                self.wait_stats['timeouts'] += 1
+            raise
+        finally:
+            waited = time.perf_counter() - started
+            with self._stats_lock:
+                self.wait_stats['checkouts'] += 1
+                self.wait_stats['wait_seconds_total'] += waited
+                self.wait_stats['wait_seconds_max'] = max(self.wait_stats['wait_seconds_max'], waited)
+
+    def recreate(self):
+        # Keep the subclass when the engine rebuilds its pool (e.g. after invalidation)
+        pool = super().recreate()
+        pool.wait_stats = self.wait_stats
+        pool._stats_lock = self._stats_lock
+        return pool
+
+
+def pool_stats(pool):
+    stats = {'pool_class': type(pool).__name__, 'status': pool.status()}
+    if isinstance(pool, QueuePool):
+        stats.update({
+            'size': pool.size(),
+            'checked_in': pool.checkedin(),
+            'checked_out': pool.checkedout(),
+            'overflow': pool.overflow(),
+            'max_overflow': pool._max_overflow
+        })
+    if isinstance(pool, InstrumentedQueuePool):
+        with pool._stats_lock:
+            wait = dict(pool.wait_stats)
+        wait['wait_seconds_avg'] = wait['wait_seconds_total'] / wait['checkouts'] if wait['checkouts'] else 0.0
+        stats['wait'] = wait
+    return stats
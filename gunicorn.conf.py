@@ -0,0 +1,48 @@
+"""Gunicorn settings, picked up automatically by `gunicorn app:app`.
+
+Firebase verification and SQL are blocking I/O, so a sync worker serves one
+request at a time and a slow Postgres round-trip or certificate refresh stalls
+it. WEB_WORKER_CLASS picks how each worker overlaps that waiting:
+
+- gthread (default): GUNICORN_THREADS requests per worker on OS threads.
+- gevent: up to GUNICORN_WORKER_CONNECTIONS requests per worker on greenlets.
+  Needs `gevent` and `psycogreen`; without psycogreen psycopg2 would block
+  the whole worker on every query.
+- sync: one request per worker, as before.
+
+In gthread mode the DB pool defaults to one connection per thread, so threads
+never queue for a connection (DB_POOL_SIZE still overrides it).
+"""
+import multiprocessing
+import os
+
+worker_class = os.getenv('WEB_WORKER_CLASS', 'gthread')
+workers = int(os.getenv('WEB_CONCURRENCY', multiprocessing.cpu_count()))
+threads = int(os.getenv('GUNICORN_THREADS', 8)) if worker_class == 'gthread' else 1
+worker_connections = int(os.getenv('GUNICORN_WORKER_CONNECTIONS', 200))
+
+bind = f"0.0.0.0:{os.getenv('PORT', '8000')}"
+timeout = int(os.getenv('GUNICORN_TIMEOUT', 30))
+graceful_timeout = int(os.getenv('GUNICORN_GRACEFUL_TIMEOUT', 30))
+keepalive = int(os.getenv('GUNICORN_KEEPALIVE', 5))
+
+# create_app() has no external side effects (Firebase and DB connect lazily),
+# so the app is imported once in the master and shared copy-on-write
+preload_app = True
+
+if worker_class == 'gthread':
+    os.environ.setdefault('DB_POOL_SIZE', str(threads))
+
+
+def post_fork(server, worker):
+    if worker_class == 'gevent':
+        try:
+            from psycogreen.gevent import patch_psycopg
+        except ImportError:
+            server.log.warning('psycogreen is not installed; SQL queries will block the gevent worker')
+        else:
+            patch_psycopg()
+
+    # Fetch Firebase signing keys now rather than on the worker's first request
+    from views.firebase_config import warm_up_firebase
+    warm_up_firebase()
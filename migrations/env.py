@@ -1,4 +1,5 @@
 import logging
+import os
 from logging.config import fileConfig
 
 from flask import current_app
@@ -104,6 +105,12 @@ def run_migrations_online():
         )
 
         with context.begin_transaction():
+            if connection.dialect.name == 'postgresql':
+                # The app engine caps statements at DB_STATEMENT_TIMEOUT_MS, but building
+                # an index or exclusion constraint on a large table can take far longer
+                connection.exec_driver_sql(
+                    f"SET LOCAL statement_timeout = {int(os.getenv('MIGRATION_STATEMENT_TIMEOUT_MS', 0))}"
+                )
             context.run_migrations()
 
 
@@ -0,0 +1,26 @@
+"""Add booking availability index
+
+Revision ID: 3c9e1f7a2b64
+Revises: a4eb7c135b2b
+Create Date: 2026-10-17 09:12:40.512731
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '3c9e1f7a2b64'
+down_revision = 'a4eb7c135b2b'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('booking', schema=None) as batch_op:
+        batch_op.create_index('ix_booking_vehicle_end_start', ['vehicle_id', 'end_date', 'start_date'], unique=False)
+
+
+def downgrade():
+    with op.batch_alter_table('booking', schema=None) as batch_op:
+        batch_op.drop_index('ix_booking_vehicle_end_start')
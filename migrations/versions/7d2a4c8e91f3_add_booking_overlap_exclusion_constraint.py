@@ -0,0 +1,38 @@
+"""Add booking overlap exclusion constraint
+
+Revision ID: 7d2a4c8e91f3
+Revises: 3c9e1f7a2b64
+Create Date: 2026-10-17 14:03:22.847105
+
+Postgres rejects two non-cancelled bookings of the same vehicle whose
+inclusive [start_date, end_date] ranges overlap, even when they are written by
+concurrent transactions. The upgrade fails if such overlaps already exist;
+resolve them (e.g. cancel duplicates) first. Other databases are left as-is.
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '7d2a4c8e91f3'
+down_revision = '3c9e1f7a2b64'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    if op.get_bind().dialect.name != 'postgresql':
+        return
+    op.execute('CREATE EXTENSION IF NOT EXISTS btree_gist')
+    op.execute(
+        "ALTER TABLE booking ADD CONSTRAINT booking_no_overlap EXCLUDE USING gist ("
+        "vehicle_id WITH =, daterange(start_date, end_date, '[]') WITH &&"
+        ") WHERE (booking_status <> 'cancelled')"
+    )
+
+
+def downgrade():
+    if op.get_bind().dialect.name != 'postgresql':
+        return
+    op.execute('ALTER TABLE booking DROP CONSTRAINT IF EXISTS booking_no_overlap')
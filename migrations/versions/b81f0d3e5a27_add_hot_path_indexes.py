@@ -0,0 +1,40 @@
+"""Add hot path indexes
+
+Revision ID: b81f0d3e5a27
+Revises: 7d2a4c8e91f3
+Create Date: 2026-10-17 15:26:08.193544
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'b81f0d3e5a27'
+down_revision = '7d2a4c8e91f3'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('booking', schema=None) as batch_op:
+        batch_op.create_index('ix_booking_user_created', ['user_id', 'created_at'], unique=False)
+        batch_op.create_index('ix_booking_status_created', ['booking_status', 'created_at'], unique=False)
+
+    with op.batch_alter_table('vehicle', schema=None) as batch_op:
+        batch_op.create_index('ix_vehicle_category_availability_price', ['category_id', 'availability', 'price'], unique=False)
+
+    with op.batch_alter_table('category', schema=None) as batch_op:
+        batch_op.create_index('ix_category_name_lower', [sa.text('lower(name)')], unique=False)
+
+
+def downgrade():
+    with op.batch_alter_table('category', schema=None) as batch_op:
+        batch_op.drop_index('ix_category_name_lower')
+
+    with op.batch_alter_table('vehicle', schema=None) as batch_op:
+        batch_op.drop_index('ix_vehicle_category_availability_price')
+
+    with op.batch_alter_table('booking', schema=None) as batch_op:
+        batch_op.drop_index('ix_booking_status_created')
+        batch_op.drop_index('ix_booking_user_created')
@@ -0,0 +1,43 @@
+"""Exclusion constraint covers bookings with a NULL status
+
+Revision ID: c6e1a3f9d2b7
+Revises: f4b2d8c6e013
+Create Date: 2026-10-17 21:40:12.503917
+
+booking_status was added without a default (a4eb7c135b2b), so older rows may
+hold NULL. `NULL <> 'cancelled'` is not true, which left those rows outside
+booking_no_overlap; IS DISTINCT FROM treats them as active. The upgrade fails
+if a NULL-status booking already overlaps another active one; resolve those
+first.
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'c6e1a3f9d2b7'
+down_revision = 'f4b2d8c6e013'
+branch_labels = None
+depends_on = None
+
+
+def recreate_constraint(predicate):
+    op.execute('ALTER TABLE booking DROP CONSTRAINT IF EXISTS booking_no_overlap')
+    op.execute(
+        "ALTER TABLE booking ADD CONSTRAINT booking_no_overlap EXCLUDE USING gist ("
+        "vehicle_id WITH =, daterange(start_date, end_date, '[]') WITH &&"
+        f") WHERE ({predicate})"
+    )
+
+
+def upgrade():
+    if op.get_bind().dialect.name != 'postgresql':
+        return
+    recreate_constraint("booking_status IS DISTINCT FROM 'cancelled'")
+
+
+def downgrade():
+    if op.get_bind().dialect.name != 'postgresql':
+        return
+    recreate_constraint("booking_status <> 'cancelled'")
@@ -0,0 +1,34 @@
+"""Backfill booking created_at and make it NOT NULL
+
+Revision ID: d9a4f2c7e1b5
+Revises: c6e1a3f9d2b7
+Create Date: 2026-10-17 22:05:37.914266
+
+The admin listing pages on a (created_at, id) keyset, which a NULL created_at
+can neither encode nor be reached through. Legacy rows take their updated_at
+when there is one, otherwise the epoch, so they sort first.
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'd9a4f2c7e1b5'
+down_revision = 'c6e1a3f9d2b7'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.execute(
+        "UPDATE booking SET created_at = COALESCE(updated_at, '1970-01-01 00:00:00') "
+        "WHERE created_at IS NULL"
+    )
+    with op.batch_alter_table('booking', schema=None) as batch_op:
+        batch_op.alter_column('created_at', existing_type=sa.DateTime(), nullable=False)
+
+
+def downgrade():
+    with op.batch_alter_table('booking', schema=None) as batch_op:
+        batch_op.alter_column('created_at', existing_type=sa.DateTime(), nullable=True)
@@ -0,0 +1,26 @@
+"""Index token_blocklist created_at
+
+Revision ID: e5c7a9d41b86
+Revises: b81f0d3e5a27
+Create Date: 2026-10-17 17:41:55.302918
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'e5c7a9d41b86'
+down_revision = 'b81f0d3e5a27'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('token_blocklist', schema=None) as batch_op:
+        batch_op.create_index(batch_op.f('ix_token_blocklist_created_at'), ['created_at'], unique=False)
+
+
+def downgrade():
+    with op.batch_alter_table('token_blocklist', schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f('ix_token_blocklist_created_at'))
@@ -0,0 +1,28 @@
+"""Add vehicle external_id
+
+Revision ID: f4b2d8c6e013
+Revises: e5c7a9d41b86
+Create Date: 2026-10-17 19:08:31.664207
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'f4b2d8c6e013'
+down_revision = 'e5c7a9d41b86'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('vehicle', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('external_id', sa.String(length=128), nullable=True))
+        batch_op.create_unique_constraint('uq_vehicle_external_id', ['external_id'])
+
+
+def downgrade():
+    with op.batch_alter_table('vehicle', schema=None) as batch_op:
+        batch_op.drop_constraint('uq_vehicle_external_id', type_='unique')
+        batch_op.drop_column('external_id')
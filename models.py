@@ -7,7 +7,7 @@ db = SQLAlchemy()
 class TokenBlocklist(db.Model):
     id = db.Column(db.Integer, primary_key=True)
     jti = db.Column(db.String(256), nullable=False, index=True)
-    created_at = db.Column(db.DateTime, nullable=False)
+    created_at = db.Column(db.DateTime, nullable=False, index=True)
 
 class User(db.Model):
     id = db.Column(db.Integer, primary_key=True)
@@ -45,9 +45,31 @@ class Vehicle(db.Model):
     transmission = db.Column(db.String(50))
     fuel_type = db.Column(db.String(50))
     category_id = db.Column(db.Integer, db.ForeignKey('category.id'), nullable=False)
+    # Key used by the fleet system's bulk sync (POST /vehicles/bulk)
+    external_id = db.Column(db.String(128), nullable=True)
     bookings = db.relationship('Booking', backref='vehicle', lazy=True, cascade="all, delete-orphan")
 
+    __table_args__ = (
+        # Serves the catalog filters: category, then availability, then price range/sort
+        db.Index('ix_vehicle_category_availability_price', 'category_id', 'availability', 'price'),
+        # Named as in migration f4b2d8c6e013, so autogenerate sees no drift
+        db.UniqueConstraint('external_id', name='uq_vehicle_external_id'),
+    )
+
+# Case-insensitive category lookups compare lower(name)
+db.Index('ix_category_name_lower', db.func.lower(Category.name))
+
 class Booking(db.Model):
+    # On Postgres the booking_no_overlap exclusion constraint (migration
+    # 7d2a4c8e91f3) also rejects overlapping non-cancelled bookings
+    __table_args__ = (
+        # Serves date-overlap lookups per vehicle (see views/availability.py)
+        db.Index('ix_booking_vehicle_end_start', 'vehicle_id', 'end_date', 'start_date'),
+        # "My bookings" and the admin status filter, both walked in created_at order
+        db.Index('ix_booking_user_created', 'user_id', 'created_at'),
+        db.Index('ix_booking_status_created', 'booking_status', 'created_at'),
+    )
+
     id = db.Column(db.Integer, primary_key=True)
     user_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=False)
     vehicle_id = db.Column(db.Integer, db.ForeignKey('vehicle.id'), nullable=False)
@@ -67,7 +89,7 @@ class Booking(db.Model):
     payment_method = db.Column(db.String(50), nullable=False)
     payment_status = db.Column(db.String(50), default='pending')
     booking_status = db.Column(db.String(50), default='confirmed')
-    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    created_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
     updated_at = db.Column(db.DateTime, onupdate=datetime.utcnow)
 
     def calculate_total(self, vehicle_price):
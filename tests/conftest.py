@@ -0,0 +1,123 @@
+import os
+import time
+import pytest
+from sqlalchemy import event, insert
+
+# Importing app builds the module-level instance, which needs a database URL
+os.environ.setdefault('APP_ENV', 'testing')
+from app import create_app  # noqa: E402
+from models import db, User, Category, Vehicle, Booking
+from datetime import date, datetime, timedelta
+import views.auth
+import views.identity
+from views.firebase_config import token_cache
+from views.identity import identity_cache
+
+
+def fake_verify_firebase_token(id_token):
+    """Test tokens look like "user:<uid>" or "admin:<uid>" (the latter carries the admin claim)."""
+    kind, _, uid = (id_token or '').partition(':')
+    if kind not in ('user', 'admin') or not uid:
+        return None
+    return {'uid': uid, 'email': f'{uid}@test.local', 'admin': kind == 'admin', 'exp': time.time() + 3600}
+
+
+def auth_header(uid, admin=False):
+    return {'Authorization': f"Bearer {'admin' if admin else 'user'}:{uid}"}
+
+
+@pytest.fixture
+def app(monkeypatch):
+    monkeypatch.setattr(views.identity, 'verify_firebase_token', fake_verify_firebase_token)
+    monkeypatch.setattr(views.auth, 'verify_firebase_token', fake_verify_firebase_token)
+    identity_cache.clear()
+    token_cache.clear()
+
+    app = create_app({'SQLALCHEMY_DATABASE_URI': 'sqlite://', 'TESTING': True})
+    with app.app_context():
+        db.create_all()
+    # No context stays pushed while the test runs: a request made inside one would
+    # reuse it, and `g` (token claims, current user) would leak between requests.
+    # Tests wrap their setup in `with app.app_context():` and call the client outside.
+    yield app
+    with app.app_context():
+        db.session.remove()
+        db.drop_all()
+
+
+@pytest.fixture
+def client(app):
+    return app.test_client()
+
+
+def make_user(uid, is_admin=False):
+    user = User(firebase_uid=uid, name=uid, email=f'{uid}@test.local', is_admin=is_admin)
+    db.session.add(user)
+    db.session.commit()
+    return user
+
+
+def make_vehicle(name='Vehicle', price=5000.0, category='SUV'):
+    category_row = Category.query.filter_by(name=category).first()
+    if not category_row:
+        category_row = Category(name=category)
+        db.session.add(category_row)
+    vehicle = Vehicle(name=name, description='Test vehicle.', price=price, category=category_row)
+    db.session.add(vehicle)
+    db.session.commit()
+    return vehicle
+
+
+def add_bookings(user_id, vehicle_id, count, first_day=date(2024, 1, 1)):
+    """Insert `count` back-to-back two-day bookings without going through the API."""
+    db.session.execute(insert(Booking), [{
+        'user_id': user_id,
+        'vehicle_id': vehicle_id,
+        'start_date': first_day + timedelta(days=2 * i),
+        'end_date': first_day + timedelta(days=2 * i + 1),
+        'total_price': 10000.0,
+        'full_name': 'Test Customer',
+        'phone': '0700000000',
+        'email': 'customer@test.local',
+        'id_number': '00000000',
+        'driving_license': 'DL-000000',
+        'pickup_option': 'pickup',
+        'payment_method': 'mpesa',
+        'created_at': datetime(2024, 1, 1) + timedelta(minutes=i)
+    } for i in range(count)])
+    db.session.commit()
+
+
+def booking_payload(vehicle_id, start_date, end_date, **overrides):
+    """A complete POST /api/bookings/ body for `vehicle_id` over the given ISO dates."""
+    payload = {
+        'vehicle_id': vehicle_id,
+        'start_date': start_date,
+        'end_date': end_date,
+        'full_name': 'Test Customer',
+        'phone': '0700000000',
+        'email': 'customer@test.local',
+        'id_number': '00000000',
+        'driving_license': 'DL-000000',
+        'pickup_option': 'pickup',
+        'payment_method': 'mpesa'
+    }
+    payload.update(overrides)
+    return payload
+
+
+def count_statements(app, fn):
+    """Run fn() and return (result, number of SQL statements it executed)."""
+    statements = []
+
+    def record(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    with app.app_context():
+        engine = db.engine
+    event.listen(engine, 'before_cursor_execute', record)
+    try:
+        result = fn()
+    finally:
+        event.remove(engine, 'before_cursor_execute', record)
+    return result, len(statements)
@@ -0,0 +1,22 @@
+from datetime import datetime
+from sqlalchemy import update
+from conftest import add_bookings, auth_header, make_user, make_vehicle
+from models import db, Booking
+
+
+def test_cursor_pages_reach_every_booking(app, client):
+    with app.app_context():
+        add_bookings(make_user('customer').id, make_vehicle().id, 7)
+        # Ties on created_at are broken by id
+        db.session.execute(update(Booking).where(Booking.id <= 4).values(created_at=datetime(2024, 1, 1)))
+        db.session.commit()
+
+    seen, cursor = [], None
+    while True:
+        query = '/api/bookings/?limit=3' + (f'&cursor={cursor}' if cursor else '')
+        page = client.get(query, headers=auth_header('boss', admin=True)).get_json()
+        seen += [booking['id'] for booking in page['bookings']]
+        cursor = page['next_cursor']
+        if not cursor:
+            break
+    assert seen == list(range(1, 8))
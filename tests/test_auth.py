@@ -0,0 +1,51 @@
+from conftest import add_bookings, auth_header, make_user, make_vehicle
+from models import Booking
+
+
+def test_identity_does_not_carry_over_between_requests(app, client):
+    with app.app_context():
+        make_user('customer')
+        make_vehicle(category='SUV')
+
+    assert client.get('/api/bookings/', headers=auth_header('boss', admin=True)).status_code == 200
+    assert client.get('/api/bookings/', headers=auth_header('customer')).status_code == 403
+    assert client.get('/api/bookings/').status_code == 401
+
+
+def test_user_admin_endpoints_refuse_customers(app, client):
+    with app.app_context():
+        make_user('customer')
+        victim_id = make_user('victim').id
+
+    assert client.get('/users/', headers=auth_header('customer')).status_code == 403
+    assert client.delete(f'/users/{victim_id}', headers=auth_header('customer')).status_code == 403
+    assert client.get('/users/').status_code == 401
+
+
+def test_admin_claim_is_enough_without_the_database_flag(app, client):
+    with app.app_context():
+        make_user('boss')  # is_admin is False in the database
+        victim_id = make_user('victim').id
+
+    headers = auth_header('boss', admin=True)
+    assert len(client.get('/users/', headers=headers).get_json()) == 2
+    assert client.delete(f'/users/{victim_id}', headers=headers).status_code == 200
+
+
+def test_database_flag_is_enough_without_the_admin_claim(app, client):
+    with app.app_context():
+        make_user('boss', is_admin=True)
+
+    assert client.get('/users/', headers=auth_header('boss')).status_code == 200
+
+
+def test_booking_details_visible_to_owner_and_admins_only(app, client):
+    with app.app_context():
+        add_bookings(make_user('owner').id, make_vehicle().id, 1)
+        make_user('other')
+        booking_id = Booking.query.one().id
+
+    path = f'/api/bookings/{booking_id}'
+    assert client.get(path, headers=auth_header('owner')).status_code == 200
+    assert client.get(path, headers=auth_header('other')).status_code == 404
+    assert client.get(path, headers=auth_header('other', admin=True)).status_code == 200
@@ -0,0 +1,25 @@
+from benchmark import compare
+
+
+def result(p95_ms=10.0, rps=100.0, errors=0):
+    return {'requests': 100, 'errors': errors, 'p50_ms': 5.0, 'p95_ms': p95_ms, 'p99_ms': 20.0, 'rps': rps}
+
+
+def test_matching_run_passes():
+    assert compare({'GET /x': result()}, {'GET /x': result()}, tolerance=0.2, noise_ms=2.0) == []
+
+
+def test_slower_p95_and_lower_throughput_fail():
+    regressions = compare({'GET /x': result(p95_ms=20.0, rps=50.0)}, {'GET /x': result()}, 0.2, 2.0)
+    assert len(regressions) == 2
+
+
+def test_p95_slowdown_within_noise_passes():
+    assert compare({'GET /x': result(p95_ms=13.0)}, {'GET /x': result()}, 0.2, 5.0) == []
+
+
+def test_any_error_fails_with_or_without_a_baseline():
+    assert compare({'GET /x': result(errors=3)}, {'GET /x': result(errors=3)}, 0.2, 2.0) == [
+        'GET /x: 3 error responses vs baseline 3'
+    ]
+    assert compare({'GET /new': result(errors=1)}, {}, 0.2, 2.0) == ['GET /new: 1 error responses vs baseline 0']
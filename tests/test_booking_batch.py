@@ -0,0 +1,59 @@
+from datetime import date
+from conftest import add_bookings, auth_header, booking_payload, make_user, make_vehicle
+from models import Booking, Vehicle
+
+
+def test_batch_rejects_non_object_body(app, client):
+    with app.app_context():
+        make_user('customer')
+    for body in ([1], 'bookings', None):
+        response = client.post('/api/bookings/batch', json=body, headers=auth_header('customer'))
+        assert response.status_code == 400
+
+
+def post_batch(client, bookings, **options):
+    return client.post('/api/bookings/batch', json={'bookings': bookings, **options}, headers=auth_header('customer'))
+
+
+def test_boolean_vehicle_id_is_not_an_integer(app, client):
+    with app.app_context():
+        make_user('customer')
+        make_vehicle()
+    response = post_batch(client, [booking_payload(True, '2030-03-01', '2030-03-02')])
+
+    assert response.status_code == 200
+    assert response.get_json()['results'] == [{'index': 0, 'status': 'error', 'error': 'vehicle_id must be an integer'}]
+
+
+def test_atomic_batch_with_an_invalid_item_is_a_bad_request(app, client):
+    with app.app_context():
+        make_user('customer')
+        vehicle_id = make_vehicle().id
+    response = post_batch(client, [
+        booking_payload(vehicle_id, '2030-03-01', '2030-03-02'),
+        booking_payload(vehicle_id, '2030-03-05', '2030-03-06', pickup_option='delivery')
+    ], atomic=True)
+
+    assert response.status_code == 400
+    assert response.get_json()['results'] == [
+        {'index': 1, 'status': 'error', 'error': 'Delivery address is required for delivery option'}
+    ]
+    with app.app_context():
+        assert Booking.query.count() == 0
+
+
+def test_atomic_batch_with_only_date_conflicts_is_a_conflict(app, client):
+    with app.app_context():
+        add_bookings(make_user('customer').id, make_vehicle().id, 1, first_day=date(2030, 3, 1))
+        vehicle_id = Vehicle.query.one().id
+    response = post_batch(client, [
+        booking_payload(vehicle_id, '2030-03-10', '2030-03-11'),
+        booking_payload(vehicle_id, '2030-03-02', '2030-03-03')
+    ], atomic=True)
+
+    assert response.status_code == 409
+    assert response.get_json()['results'] == [
+        {'index': 1, 'status': 'error', 'error': 'Vehicle is already booked for the selected dates'}
+    ]
+    with app.app_context():
+        assert Booking.query.count() == 1
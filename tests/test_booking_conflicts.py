@@ -0,0 +1,96 @@
+import pytest
+from sqlalchemy import event
+from sqlalchemy.exc import DBAPIError, IntegrityError
+from sqlalchemy.orm import Session
+from conftest import auth_header, booking_payload, make_user, make_vehicle
+from models import db, Booking
+from views.availability import is_booking_conflict
+
+
+class FakePostgresError(Exception):
+    """Stands in for a psycopg2 error, which carries the SQLSTATE as `pgcode`."""
+
+    def __init__(self, pgcode):
+        super().__init__(pgcode)
+        self.pgcode = pgcode
+
+
+def database_error(pgcode, error_class=DBAPIError):
+    return error_class('INSERT INTO booking ...', {}, FakePostgresError(pgcode))
+
+
+@pytest.fixture
+def failing_commit():
+    """Make the next commit fail the way Postgres reports `pgcode`."""
+    listeners = []
+
+    def fail_with(pgcode):
+        def before_commit(session):
+            raise database_error(pgcode, IntegrityError)
+        event.listen(Session, 'before_commit', before_commit)
+        listeners.append(before_commit)
+
+    yield fail_with
+    for listener in listeners:
+        event.remove(Session, 'before_commit', listener)
+
+
+@pytest.mark.parametrize('pgcode', ['23P01', '40P01', '40001', '55P03'])
+def test_lost_races_are_booking_conflicts(pgcode):
+    assert is_booking_conflict(database_error(pgcode))
+
+
+@pytest.mark.parametrize('error', [database_error('23505'), database_error(None), ValueError('23P01')])
+def test_other_errors_are_not_booking_conflicts(error):
+    assert not is_booking_conflict(error)
+
+
+def test_exclusion_violation_on_create_is_409(app, client, failing_commit):
+    with app.app_context():
+        make_user('customer')
+        vehicle_id = make_vehicle().id
+    failing_commit('23P01')
+    response = client.post('/api/bookings/', json=booking_payload(vehicle_id, '2030-03-10', '2030-03-12'),
+                           headers=auth_header('customer'))
+    assert response.status_code == 409
+
+
+def test_unexpected_database_error_on_create_is_500(app, client, failing_commit):
+    with app.app_context():
+        make_user('customer')
+        vehicle_id = make_vehicle().id
+    failing_commit('23505')
+    response = client.post('/api/bookings/', json=booking_payload(vehicle_id, '2030-03-10', '2030-03-12'),
+                           headers=auth_header('customer'))
+    assert response.status_code == 500
+
+
+def test_deadlock_on_batch_creates_nothing_and_is_409(app, client, failing_commit):
+    with app.app_context():
+        make_user('customer')
+        vehicle_id = make_vehicle().id
+    failing_commit('40P01')
+    response = client.post('/api/bookings/batch', headers=auth_header('customer'), json={
+        'bookings': [booking_payload(vehicle_id, '2030-03-10', '2030-03-12')]
+    })
+    assert response.status_code == 409
+    with app.app_context():
+        assert Booking.query.count() == 0
+
+
+def test_reactivating_a_cancelled_booking_rechecks_its_dates(app, client):
+    with app.app_context():
+        make_user('customer')
+        make_user('boss', is_admin=True)
+        vehicle_id = make_vehicle().id
+    book = lambda: client.post('/api/bookings/', json=booking_payload(vehicle_id, '2030-03-10', '2030-03-12'),
+                               headers=auth_header('customer'))
+    first_id = book().get_json()['booking_id']
+    assert client.patch(f'/api/bookings/{first_id}/cancel', headers=auth_header('customer')).status_code == 200
+    assert book().status_code == 201
+
+    response = client.patch(f'/api/bookings/{first_id}/status', json={'status': 'confirmed'},
+                            headers=auth_header('boss', admin=True))
+    assert response.status_code == 409
+    with app.app_context():
+        assert db.session.get(Booking, first_id).booking_status == 'cancelled'
@@ -0,0 +1,44 @@
+from datetime import date
+from sqlalchemy import update
+from conftest import add_bookings, auth_header, booking_payload, make_user, make_vehicle
+from models import db, Booking
+
+
+def book(client, vehicle_id, start_date, end_date):
+    return client.post('/api/bookings/', json=booking_payload(vehicle_id, start_date, end_date),
+                       headers=auth_header('customer'))
+
+
+def test_overlapping_booking_is_rejected(app, client):
+    with app.app_context():
+        make_user('customer')
+        vehicle_id = make_vehicle().id
+
+    assert book(client, vehicle_id, '2030-03-10', '2030-03-14').status_code == 201
+    # Dates are inclusive: sharing the last day is an overlap, the day after is not
+    assert book(client, vehicle_id, '2030-03-14', '2030-03-16').status_code == 409
+    assert book(client, vehicle_id, '2030-03-01', '2030-03-20').status_code == 409
+    assert book(client, vehicle_id, '2030-03-15', '2030-03-17').status_code == 201
+
+
+def test_cancelled_booking_frees_its_dates(app, client):
+    with app.app_context():
+        make_user('customer')
+        vehicle_id = make_vehicle().id
+
+    booking_id = book(client, vehicle_id, '2030-03-10', '2030-03-14').get_json()['booking_id']
+    assert client.patch(f'/api/bookings/{booking_id}/cancel', headers=auth_header('customer')).status_code == 200
+    assert book(client, vehicle_id, '2030-03-12', '2030-03-13').status_code == 201
+
+
+def test_booking_with_null_status_still_blocks(app, client):
+    with app.app_context():
+        vehicle_id = make_vehicle().id
+        add_bookings(make_user('customer').id, vehicle_id, 1, first_day=date(2030, 3, 10))
+        # Rows written before booking_status existed hold NULL there
+        db.session.execute(update(Booking).values(booking_status=None))
+        db.session.commit()
+
+    assert book(client, vehicle_id, '2030-03-11', '2030-03-13').status_code == 409
+    response = client.get('/vehicles/?start_date=2030-03-11&end_date=2030-03-13')
+    assert vehicle_id not in [vehicle['id'] for vehicle in response.get_json()]
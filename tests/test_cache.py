@@ -0,0 +1,108 @@
+import sys
+import threading
+import time
+import pytest
+from views.cache import SINGLE_FLIGHT_POLL, SINGLE_FLIGHT_TIMEOUT, LocalSharedCache, MemoryCache, bump_version, get_cache, get_or_compute, response_stats
+from conftest import make_vehicle
+
+
+def test_new_bookings_only_invalidate_date_searches(app, client):
+    with app.app_context():
+        make_vehicle()
+    response_stats.update(hits=0, misses=0, not_modified=0)
+    dated = '/vehicles/?start_date=2030-01-01&end_date=2030-01-03'
+    client.get('/vehicles/')
+    client.get(dated)
+
+    with app.app_context():
+        bump_version('bookings')
+
+    client.get('/vehicles/')
+    assert response_stats['hits'] == 1  # plain catalog page still cached
+    client.get(dated)
+    assert response_stats['hits'] == 1  # date search re-rendered
+
+
+def test_waiter_stops_when_lock_holder_caches_nothing(app):
+    with app.app_context():
+        cache = get_cache()
+        cache.add('lock:missing', 'other-worker', ttl=SINGLE_FLIGHT_TIMEOUT)
+        # The other worker finishes shortly without caching (e.g. its view returned 404)
+        threading.Timer(0.2, cache.delete, args=('lock:missing',)).start()
+
+        started = time.monotonic()
+        assert get_or_compute('missing', lambda: 'rendered') == 'rendered'
+        assert time.monotonic() - started < 2
+
+
+def race(count, target):
+    """Run target() on `count` threads released together; returns their results."""
+    barrier = threading.Barrier(count)
+    results = [None] * count
+
+    def run(i):
+        barrier.wait()
+        results[i] = target()
+
+    # Switch threads as often as possible so check-then-set races surface
+    interval = sys.getswitchinterval()
+    sys.setswitchinterval(1e-6)
+    try:
+        threads = [threading.Thread(target=run, args=(i,)) for i in range(count)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+    finally:
+        sys.setswitchinterval(interval)
+    return results
+
+
+@pytest.mark.parametrize('cache', [MemoryCache(), LocalSharedCache()], ids=['memory', 'local'])
+def test_add_has_exactly_one_winner(cache):
+    for attempt in range(50):
+        assert race(8, lambda: cache.add(f'lock:{attempt}', 'holder', ttl=10)).count(True) == 1
+
+
+def test_racing_misses_compute_once(app):
+    calls = []
+
+    def compute():
+        calls.append(1)
+        time.sleep(0.01)
+        return 'value'
+
+    def miss():
+        with app.app_context():
+            return get_or_compute('raced', compute)
+
+    started = time.monotonic()
+    assert race(8, miss) == ['value'] * 8
+    assert len(calls) == 1
+    # Waiters in this process are woken, not left to sleep out a poll interval
+    assert time.monotonic() - started < SINGLE_FLIGHT_POLL
+    # One miss per caller and one hit per waiter: waiting adds no lookups of its own
+    store = app.extensions['cache'].stats()
+    assert (store['misses'], store['hits']) == (8, 7)
+
+
+def test_concurrent_misses_compute_once(app):
+    calls = []
+
+    def compute():
+        calls.append(1)
+        time.sleep(0.2)
+        return 'value'
+
+    def worker():
+        with app.app_context():
+            results.append(get_or_compute('shared', compute))
+
+    results = []
+    threads = [threading.Thread(target=worker) for _ in range(5)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert results == ['value'] * 5
+    assert len(calls) == 1
@@ -0,0 +1,41 @@
+import gzip
+import zlib
+from views.compression import compress, compress_stream
+from conftest import make_vehicle
+
+
+def test_gzip_stream_emits_each_chunk_immediately():
+    stream = compress_stream(iter(['{"id": 1}\n', '{"id": 2}\n']), 'gzip')
+    decompressor = zlib.decompressobj(16 + zlib.MAX_WBITS)
+    assert decompressor.decompress(next(stream)) == b'{"id": 1}\n'
+    assert decompressor.decompress(next(stream)) == b'{"id": 2}\n'
+    assert gzip.decompress(b''.join(compress_stream(iter(['a', 'b']), 'gzip'))) == b'ab'
+
+
+def test_buffered_gzip_round_trips():
+    data = b'{"vehicles": []}' * 200
+    assert gzip.decompress(compress(data, 'gzip')) == data
+
+
+def test_buffered_response_is_gzipped_above_min_size(app, client):
+    app.config['COMPRESS_MIN_SIZE'] = 0
+    with app.app_context():
+        make_vehicle()
+    plain = client.get('/vehicles/')
+    compressed = client.get('/vehicles/', headers={'Accept-Encoding': 'gzip'})
+    assert compressed.headers['Content-Encoding'] == 'gzip'
+    assert gzip.decompress(compressed.get_data()) == plain.get_data()
+
+
+def test_not_modified_repeats_the_weak_etag_of_a_compressed_200(app, client):
+    app.config['COMPRESS_MIN_SIZE'] = 0
+    with app.app_context():
+        make_vehicle()
+    headers = {'Accept-Encoding': 'gzip'}
+    first = client.get('/vehicles/', headers=headers)
+    assert first.headers['Content-Encoding'] == 'gzip'
+    assert first.headers['ETag'].startswith('W/')
+
+    second = client.get('/vehicles/', headers={**headers, 'If-None-Match': first.headers['ETag']})
+    assert second.status_code == 304
+    assert second.headers['ETag'] == first.headers['ETag']
@@ -0,0 +1,30 @@
+import pytest
+import config
+from app import create_app
+from db_pool import InstrumentedQueuePool
+
+
+def test_database_url_is_required_outside_local_environments(monkeypatch):
+    monkeypatch.delenv('DATABASE_URL', raising=False)
+    monkeypatch.setattr(config, 'APP_ENV', 'production')
+    assert config.database_url() is None
+    with pytest.raises(RuntimeError, match='DATABASE_URL is not set'):
+        create_app({'SQLALCHEMY_DATABASE_URI': config.database_url()})
+
+    monkeypatch.setattr(config, 'APP_ENV', 'development')
+    assert config.database_url() == config.DEFAULT_DATABASE_URL
+
+
+def test_database_url_accepts_heroku_style_scheme(monkeypatch):
+    monkeypatch.setenv('DATABASE_URL', 'postgres://user@db.internal/rentals')
+    assert config.database_url() == 'postgresql://user@db.internal/rentals'
+
+
+def test_postgres_engine_options(monkeypatch):
+    monkeypatch.delenv('DB_PGBOUNCER', raising=False)
+    monkeypatch.delenv('DB_LOCK_TIMEOUT_MS', raising=False)
+    monkeypatch.setenv('DB_STATEMENT_TIMEOUT_MS', '1000')
+    options = config.engine_options('postgresql://db.internal/rentals')
+    assert options['poolclass'] is InstrumentedQueuePool
+    assert options['hide_parameters'] is True
+    assert options['connect_args'] == {'options': '-c statement_timeout=1000 -c lock_timeout=5000'}
@@ -0,0 +1,48 @@
+import csv
+import io
+import json
+from sqlalchemy import update
+from conftest import add_bookings, auth_header, make_user, make_vehicle
+from models import db, Booking, User
+
+
+def export(client, query=''):
+    response = client.get(f'/api/bookings/export{query}', headers=auth_header('boss', admin=True))
+    assert response.status_code == 200
+    return response
+
+
+def test_csv_export_columns_and_filters(app, client):
+    with app.app_context():
+        add_bookings(make_user('customer').id, make_vehicle().id, 4)
+        db.session.execute(update(Booking).where(Booking.id > 2).values(booking_status='cancelled'))
+        db.session.commit()
+
+    response = export(client, '?status=cancelled')
+    assert response.is_streamed
+    assert response.mimetype == 'text/csv'
+    assert response.headers['Content-Disposition'].startswith('attachment; filename="bookings-')
+
+    rows = list(csv.DictReader(io.StringIO(response.get_data(as_text=True))))
+    assert [row['id'] for row in rows] == ['3', '4']
+    assert list(rows[0]) == [
+        'id', 'user_id', 'vehicle_id', 'start_date', 'end_date', 'total_price', 'driver_fee', 'need_driver',
+        'pickup_option', 'payment_method', 'payment_status', 'booking_status', 'created_at', 'updated_at'
+    ]
+    assert {row['booking_status'] for row in rows} == {'cancelled'}
+
+
+def test_csv_export_neutralises_formulas_in_names(app, client):
+    with app.app_context():
+        add_bookings(make_user('customer').id, make_vehicle('-Van').id, 1)
+        # Users choose their own name through PATCH /users/me
+        db.session.execute(update(User).values(name='=HYPERLINK("http://evil.example","x")'))
+        db.session.commit()
+
+    rows = list(csv.DictReader(io.StringIO(export(client, '?include_names=true').get_data(as_text=True))))
+    assert rows[0]['user_name'] == '\'=HYPERLINK("http://evil.example","x")'
+    assert rows[0]['vehicle_name'] == "'-Van"
+    assert rows[0]['total_price'] == '10000.0'
+
+    line = json.loads(export(client, '?include_names=true&format=ndjson').get_data())
+    assert line['user_name'] == '=HYPERLINK("http://evil.example","x")'
@@ -0,0 +1,129 @@
+import json
+import os
+import time
+from datetime import datetime, timedelta, timezone
+import jwt
+import pytest
+from cryptography import x509
+from cryptography.hazmat.primitives import hashes, serialization
+from cryptography.hazmat.primitives.asymmetric import rsa
+from cryptography.x509.oid import NameOID
+import views.firebase_config
+from views.firebase_config import LocalTokenVerifier, PublicKeyStore
+
+PROJECT_ID = 'test-project'
+
+
+def make_signing_key():
+    """An RSA key and the PEM of a self-signed certificate for it, like Google publishes."""
+    key = rsa.generate_private_key(public_exponent=65537, key_size=2048)
+    name = x509.Name([x509.NameAttribute(NameOID.COMMON_NAME, 'securetoken.system.gserviceaccount.com')])
+    now = datetime.now(timezone.utc)
+    cert = x509.CertificateBuilder().subject_name(name).issuer_name(name).public_key(key.public_key()) \
+        .serial_number(x509.random_serial_number()).not_valid_before(now - timedelta(days=1)) \
+        .not_valid_after(now + timedelta(days=1)).sign(key, hashes.SHA256())
+    return key, cert.public_bytes(serialization.Encoding.PEM).decode('utf-8')
+
+
+def write_certs(path, certs):
+    previous_mtime = os.path.getmtime(path) if os.path.exists(path) else None
+    with open(path, 'w') as f:
+        json.dump(certs, f)
+    # A rewrite must change the mtime the refresher compares, whatever the filesystem's resolution
+    if previous_mtime is not None:
+        os.utime(path, (previous_mtime + 1, previous_mtime + 1))
+
+
+def sign(key, kid, **overrides):
+    now = int(time.time())
+    claims = {
+        'iss': f'https://securetoken.google.com/{PROJECT_ID}',
+        'aud': PROJECT_ID,
+        'sub': 'firebase-uid',
+        'iat': now - 10,
+        'exp': now + 3600,
+        'auth_time': now - 10
+    }
+    claims.update(overrides)
+    claims = {name: value for name, value in claims.items() if value is not None}
+    return jwt.encode(claims, key, algorithm='RS256', headers={'kid': kid})
+
+
+@pytest.fixture
+def signing_key():
+    return make_signing_key()
+
+
+@pytest.fixture
+def certs_file(tmp_path, signing_key):
+    path = str(tmp_path / 'certs.json')
+    write_certs(path, {'key-1': signing_key[1]})
+    return path
+
+
+@pytest.fixture
+def verifier(certs_file, monkeypatch):
+    monkeypatch.setattr(views.firebase_config, 'KEY_RETRY_INTERVAL', 0.05)
+    return LocalTokenVerifier(PROJECT_ID, PublicKeyStore(certs_file=certs_file))
+
+
+def test_valid_token(verifier, signing_key):
+    claims = verifier.verify(sign(signing_key[0], 'key-1'))
+    assert claims['uid'] == 'firebase-uid'
+
+
+@pytest.mark.parametrize('overrides, error', [
+    ({'aud': 'other-project'}, jwt.InvalidAudienceError),
+    ({'iss': 'https://securetoken.google.com/other-project'}, jwt.InvalidIssuerError),
+    ({'exp': int(time.time()) - 60}, jwt.ExpiredSignatureError),
+    ({'iat': int(time.time()) + 3600}, jwt.ImmatureSignatureError),
+    ({'sub': None}, jwt.MissingRequiredClaimError),
+    ({'sub': ''}, ValueError),
+], ids=['wrong-aud', 'wrong-iss', 'expired', 'future-iat', 'missing-sub', 'empty-sub'])
+def test_rejected_claims(verifier, signing_key, overrides, error):
+    with pytest.raises(error):
+        verifier.verify(sign(signing_key[0], 'key-1', **overrides))
+
+
+def test_unknown_kid(verifier, signing_key):
+    with pytest.raises(ValueError, match='Unknown signing key'):
+        verifier.verify(sign(signing_key[0], 'key-2'))
+
+
+def test_signature_from_another_key(verifier):
+    other_key, _ = make_signing_key()
+    with pytest.raises(jwt.InvalidSignatureError):
+        verifier.verify(sign(other_key, 'key-1'))
+
+
+def test_key_rotation_picked_up_from_file(verifier, certs_file, signing_key):
+    old_token = sign(signing_key[0], 'key-1')
+    verifier.verify(old_token)
+
+    new_key, new_cert = make_signing_key()
+    write_certs(certs_file, {'key-2': new_cert})
+    new_token = sign(new_key, 'key-2')
+
+    # The first unknown kid wakes the refresher; the token is accepted once it reloads
+    deadline = time.monotonic() + 2
+    while True:
+        try:
+            assert verifier.verify(new_token)['uid'] == 'firebase-uid'
+            break
+        except ValueError:
+            assert time.monotonic() < deadline, 'rotated key was never loaded'
+            time.sleep(0.05)
+
+    with pytest.raises(ValueError, match='Unknown signing key'):
+        verifier.verify(old_token)
+
+
+def test_rejected_token_is_logged_not_printed(verifier, signing_key, monkeypatch, caplog, capsys):
+    monkeypatch.setattr(views.firebase_config, 'FIREBASE_VERIFIER', 'local')
+    monkeypatch.setattr(views.firebase_config, 'local_verifier', verifier)
+    other_key, _ = make_signing_key()
+
+    assert views.firebase_config.verify_firebase_token(sign(other_key, 'key-1')) is None
+    assert any(record.levelname == 'WARNING' and 'Token verification error' in record.getMessage()
+               for record in caplog.records)
+    assert capsys.readouterr().out == ''
@@ -0,0 +1,64 @@
+from sqlalchemy import event
+from conftest import add_bookings, auth_header, make_user, make_vehicle
+from models import db
+
+
+def query_plans(app, client, path, headers=None):
+    """Request `path` and return the EXPLAIN QUERY PLAN text of every SELECT it ran."""
+    selects = []
+
+    def record(conn, cursor, statement, parameters, context, executemany):
+        if statement.lstrip().upper().startswith('SELECT'):
+            selects.append((statement, parameters))
+
+    # Warm the identity cache first so only the view's own queries are captured
+    # and drop the response it may have cached so the view really runs
+    client.get(path, headers=headers).get_data()
+    app.extensions['cache'].clear()
+    with app.app_context():
+        engine = db.engine
+    event.listen(engine, 'before_cursor_execute', record)
+    try:
+        response = client.get(path, headers=headers)
+        response.get_data()  # streamed bodies run their queries while being read
+    finally:
+        event.remove(engine, 'before_cursor_execute', record)
+    assert response.status_code == 200
+
+    with app.app_context():
+        connection = db.session.connection().connection.driver_connection
+        return [
+            ' / '.join(row[3] for row in connection.execute(f'EXPLAIN QUERY PLAN {statement}', parameters))
+            for statement, parameters in selects
+        ]
+
+
+def assert_uses_index(plans, index_name):
+    assert any(index_name in plan for plan in plans), f'{index_name} not used by any of: {plans}'
+
+
+def test_my_bookings_uses_user_created_index(app, client):
+    with app.app_context():
+        add_bookings(make_user('customer').id, make_vehicle().id, 20)
+
+    plans = query_plans(app, client, '/api/bookings/my', auth_header('customer'))
+    assert_uses_index(plans, 'ix_booking_user_created')
+
+
+def test_admin_status_filter_uses_status_created_index(app, client):
+    with app.app_context():
+        make_user('boss', is_admin=True)
+        add_bookings(make_user('customer').id, make_vehicle().id, 20)
+
+    plans = query_plans(app, client, '/api/bookings/?status=pending&limit=10', auth_header('boss', admin=True))
+    assert_uses_index(plans, 'ix_booking_status_created')
+
+
+def test_vehicle_category_and_price_filter_uses_indexes(app, client):
+    with app.app_context():
+        for i in range(20):
+            make_vehicle(f'Vehicle {i}', price=1000.0 * i, category='SUV' if i % 2 else 'Sedan')
+
+    plans = query_plans(app, client, '/vehicles/?category=suv&available=true&min_price=2000&max_price=9000')
+    assert_uses_index(plans, 'ix_category_name_lower')
+    assert_uses_index(plans, 'ix_vehicle_category_availability_price')
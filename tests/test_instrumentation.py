@@ -0,0 +1,60 @@
+import logging
+import views.instrumentation
+from conftest import make_vehicle
+from views.instrumentation import Histogram, request_latency, request_queries
+
+
+def series_value(histogram, line_prefix):
+    """Value of the rendered line starting with `line_prefix`, 0 when the series does not exist yet."""
+    for line in histogram.render():
+        if line.startswith(line_prefix + ' '):
+            return float(line.rsplit(' ', 1)[1])
+    return 0.0
+
+
+def test_histogram_renders_cumulative_buckets():
+    histogram = Histogram('demo_seconds', 'Demo.', (0.1, 1.0), ('route',))
+    for value in (0.05, 0.5, 0.5, 3.0):
+        histogram.observe(value, '/a"b')
+
+    assert histogram.render() == [
+        '# HELP demo_seconds Demo.',
+        '# TYPE demo_seconds histogram',
+        'demo_seconds_bucket{route="/a\\"b",le="0.1"} 1',
+        'demo_seconds_bucket{route="/a\\"b",le="1.0"} 3',
+        'demo_seconds_bucket{route="/a\\"b",le="+Inf"} 4',
+        'demo_seconds_sum{route="/a\\"b"} 4.05',
+        'demo_seconds_count{route="/a\\"b"} 4'
+    ]
+
+
+def test_requests_record_latency_and_query_count_by_route(app, client):
+    with app.app_context():
+        vehicle_id = make_vehicle().id
+    labels = '{method="GET",route="/vehicles/<int:vehicle_id>"'
+    latency_count = f'http_request_duration_seconds_count{labels},status="200"}}'
+    queries_count = f'http_request_queries_count{labels}}}'
+    queries_sum = f'http_request_queries_sum{labels}}}'
+    before = [series_value(request_latency, latency_count), series_value(request_queries, queries_count),
+              series_value(request_queries, queries_sum)]
+
+    assert client.get(f'/vehicles/{vehicle_id}').status_code == 200
+
+    assert series_value(request_latency, latency_count) == before[0] + 1
+    assert series_value(request_queries, queries_count) == before[1] + 1
+    assert series_value(request_queries, queries_sum) > before[2]
+
+    app.config['METRICS_TOKEN'] = 'scrape-secret'
+    metrics = client.get('/metrics', headers={'Authorization': 'Bearer scrape-secret'}).get_data(as_text=True)
+    assert queries_count in metrics
+
+
+def test_slow_query_log_leaves_out_parameters(app, client, monkeypatch, caplog):
+    monkeypatch.setattr(views.instrumentation, '_slow_query_seconds', 0)
+    with caplog.at_level(logging.WARNING, logger='views.instrumentation'):
+        assert client.get('/vehicles/?category=secret-category-name').status_code == 200
+
+    slow = [record.getMessage() for record in caplog.records if record.name == 'views.instrumentation']
+    assert slow and all('[parameters redacted]' in message for message in slow)
+    assert any('route=vehicle_bp.' in message and 'SELECT' in message for message in slow)
+    assert not any('secret-category-name' in message for message in slow)
@@ -0,0 +1,26 @@
+from models import db
+
+
+def test_metrics_hidden_without_token_or_allow_list(app, client):
+    for path in ('/metrics', '/metrics/pool', '/metrics/cache'):
+        assert client.get(path).status_code == 404
+
+
+def test_metrics_require_the_configured_token(app, client):
+    app.config['METRICS_TOKEN'] = 'scrape-secret'
+
+    assert client.get('/metrics', headers={'Authorization': 'Bearer wrong'}).status_code == 404
+    response = client.get('/metrics', headers={'Authorization': 'Bearer scrape-secret'})
+    assert response.status_code == 200
+    assert b'response_cache_hits_total' in response.data
+
+
+def test_metrics_allow_listed_networks(app, client):
+    app.config['METRICS_ALLOWED_IPS'] = '10.0.0.0/8'
+    assert client.get('/metrics/pool', environ_base={'REMOTE_ADDR': '192.168.1.5'}).status_code == 404
+    assert client.get('/metrics/pool', environ_base={'REMOTE_ADDR': '10.1.2.3'}).status_code == 200
+
+
+def test_engine_hides_bound_parameters(app):
+    with app.app_context():
+        assert db.engine.hide_parameters
@@ -0,0 +1,47 @@
+from datetime import date
+from conftest import add_bookings, auth_header, count_statements, make_user, make_vehicle
+
+
+def statements_for(app, client, path, headers):
+    def fetch():
+        response = client.get(path, headers=headers)
+        response.get_data()  # streamed bodies run their queries while being read
+        return response
+
+    # Warm the identity cache first so only the view's own queries are counted
+    fetch()
+    response, count = count_statements(app, fetch)
+    assert response.status_code == 200
+    return response, count
+
+
+def test_my_bookings_statement_count_is_constant(app, client):
+    with app.app_context():
+        user_id, vehicle_id = make_user('customer').id, make_vehicle().id
+        add_bookings(user_id, vehicle_id, 5)
+    headers = auth_header('customer')
+
+    response, small = statements_for(app, client, '/api/bookings/my', headers)
+    assert len(response.get_json()) == 5
+
+    with app.app_context():
+        add_bookings(user_id, vehicle_id, 45, first_day=date(2025, 1, 1))
+    response, large = statements_for(app, client, '/api/bookings/my', headers)
+    assert len(response.get_json()) == 50
+    assert small == large
+
+
+def test_admin_bookings_statement_count_is_constant(app, client):
+    with app.app_context():
+        user_id, vehicle_id = make_user('customer').id, make_vehicle().id
+        add_bookings(user_id, vehicle_id, 5)
+    headers = auth_header('boss', admin=True)
+
+    response, small = statements_for(app, client, '/api/bookings/', headers)
+    assert len(response.get_json()) == 5
+
+    with app.app_context():
+        add_bookings(user_id, vehicle_id, 45, first_day=date(2025, 1, 1))
+    response, large = statements_for(app, client, '/api/bookings/', headers)
+    assert len(response.get_json()) == 50
+    assert small == large
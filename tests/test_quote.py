@@ -0,0 +1,63 @@
+from datetime import date
+from conftest import add_bookings, make_user, make_vehicle
+from models import db
+from views.pricing import LongRentalDiscount, SeasonalRate
+
+
+def quote(client, **body):
+    response = client.post('/api/bookings/quote', json=body)
+    assert response.status_code == 200
+    return response.get_json()
+
+
+def test_single_vehicle_quote_charges_every_day_and_the_driver(app, client):
+    with app.app_context():
+        vehicle_id = make_vehicle(price=5000.0).id
+    result = quote(client, vehicle_id=vehicle_id, start_date='2030-03-10', end_date='2030-03-12', need_driver=True)
+
+    assert result['days'] == 3
+    assert result['rental_price'] == 15000.0
+    assert result['driver_fee'] == 3000.0
+    assert result['total_price'] == 18000.0
+    assert result['available'] is True
+
+
+def test_available_reflects_listing_and_bookings_on_both_paths(app, client):
+    with app.app_context():
+        free_id = make_vehicle('Free').id
+        unlisted = make_vehicle('Unlisted')
+        unlisted.availability = False
+        db.session.commit()
+        unlisted_id = unlisted.id
+        booked_id = make_vehicle('Booked').id
+        add_bookings(make_user('customer').id, booked_id, 1, first_day=date(2030, 3, 11))
+    dates = {'start_date': '2030-03-10', 'end_date': '2030-03-12'}
+    expected = {free_id: True, unlisted_id: False, booked_id: False}
+
+    batch = quote(client, vehicle_ids=[free_id, unlisted_id, booked_id], **dates)['quotes']
+    assert {q['vehicle_id']: q['available'] for q in batch} == expected
+    for vehicle_id, available in expected.items():
+        assert quote(client, vehicle_id=vehicle_id, **dates)['available'] is available
+
+
+def test_seasonal_rate_then_long_rental_discount(app, client):
+    app.config['PRICING_RULES'] = [
+        SeasonalRate('Festive', (12, 24), (1, 2), 1.5),
+        LongRentalDiscount('Weekly', 7, 10)
+    ]
+    with app.app_context():
+        vehicle_id = make_vehicle(price=1000.0).id
+    # Seven days, the last three in season: 7 + 1.5 rate-days, then 10% off the 8.5
+    result = quote(client, vehicle_id=vehicle_id, start_date='2030-12-20', end_date='2030-12-26')
+
+    assert result['base_price'] == 7000.0
+    assert result['adjustments'] == [{'rule': 'Festive', 'amount': 1500.0}, {'rule': 'Weekly', 'amount': -850.0}]
+    assert result['total_price'] == 7650.0
+    batch = quote(client, vehicle_ids=[vehicle_id], start_date='2030-12-20', end_date='2030-12-26')['quotes']
+    assert batch[0]['total_price'] == 7650.0
+
+
+def test_boolean_vehicle_id_is_rejected(app, client):
+    response = client.post('/api/bookings/quote', json={'vehicle_id': True, 'start_date': '2030-03-10',
+                                                         'end_date': '2030-03-12'})
+    assert response.status_code == 400
@@ -0,0 +1,103 @@
+import threading
+import time
+from datetime import datetime, timedelta
+import pytest
+import views.auth
+import views.firebase_config
+import views.identity
+from conftest import auth_header, fake_verify_firebase_token, make_user
+from models import db, TokenBlocklist
+from views.background import ProcessThread
+from views.revocation import REVOKED_TOKEN_TTL, RevokedTokens, purge_expired_tokens, revoked_tokens
+
+
+class StubVerifier:
+    """Accepts the conftest test tokens in place of signed Firebase ID tokens."""
+
+    def verify(self, id_token):
+        claims = fake_verify_firebase_token(id_token)
+        if claims is None:
+            raise ValueError('Not a test token')
+        return claims
+
+
+@pytest.fixture
+def real_verification(app, monkeypatch):
+    """Route tokens through verify_firebase_token, and so through the blocklist."""
+    monkeypatch.setattr(views.identity, 'verify_firebase_token', views.firebase_config.verify_firebase_token)
+    monkeypatch.setattr(views.auth, 'verify_firebase_token', views.firebase_config.verify_firebase_token)
+    monkeypatch.setattr(views.firebase_config, 'FIREBASE_VERIFIER', 'local')
+    monkeypatch.setattr(views.firebase_config, 'local_verifier', StubVerifier())
+    revoked_tokens.clear()
+    yield
+    revoked_tokens.clear()
+
+
+def test_logged_out_token_is_rejected(app, client, real_verification):
+    with app.app_context():
+        make_user('customer')
+    headers = auth_header('customer')
+    assert client.get('/api/bookings/my', headers=headers).status_code == 200
+
+    assert client.post('/auth/logout', headers=headers).status_code == 200
+    assert client.get('/api/bookings/my', headers=headers).status_code == 401
+    assert client.post('/auth/logout', headers=headers).status_code == 401
+    assert client.get('/api/bookings/my', headers=auth_header('customer', admin=True)).status_code == 200
+
+
+def test_refresh_picks_up_revocations_from_other_workers(app):
+    tokens = RevokedTokens(refresh_interval=0.1)
+    with app.app_context():
+        assert not tokens.is_revoked('late')
+        # Written by another worker: no invalidation message reaches this one
+        now = datetime.utcnow()
+        db.session.add_all([
+            TokenBlocklist(jti='late', created_at=now),
+            TokenBlocklist(jti='expired', created_at=now - timedelta(seconds=REVOKED_TOKEN_TTL + 60))
+        ])
+        db.session.commit()
+        assert not tokens.is_revoked('late')  # not due for a refresh yet
+
+        time.sleep(0.15)
+        assert tokens.is_revoked('late')
+        assert not tokens.is_revoked('expired')
+
+        # A transaction that committed after the watermark moved past its timestamp
+        db.session.add(TokenBlocklist(jti='straggler', created_at=now - timedelta(seconds=10)))
+        db.session.commit()
+        time.sleep(0.15)
+        assert tokens.is_revoked('straggler')
+
+
+def test_purge_drops_only_expired_rows(app):
+    with app.app_context():
+        now = datetime.utcnow()
+        db.session.add_all([
+            TokenBlocklist(jti='fresh', created_at=now),
+            TokenBlocklist(jti='old', created_at=now - timedelta(seconds=REVOKED_TOKEN_TTL + 1))
+        ])
+        db.session.commit()
+
+        assert purge_expired_tokens() == 1
+        assert [row.jti for row in TokenBlocklist.query.all()] == ['fresh']
+
+
+def test_process_thread_starts_once_and_retries_a_failed_start():
+    started = []
+    release = threading.Event()
+    thread = ProcessThread('test')
+
+    def failing_start():
+        raise RuntimeError('not ready')
+
+    with pytest.raises(RuntimeError):
+        thread.ensure_started(failing_start)
+
+    def start():
+        started.append(1)
+        return release.wait
+
+    for _ in range(3):
+        thread.ensure_started(start)
+    release.set()
+    assert started == [1]
@@ -0,0 +1,47 @@
+from sqlalchemy import text
+from conftest import auth_header, make_vehicle
+from models import db, Vehicle
+
+
+def bulk_row(n, **overrides):
+    row = {'external_id': f'fleet-{n}', 'name': f'Vehicle {n}', 'description': 'Synced.', 'price': 4000, 'category': 'suv'}
+    row.update(overrides)
+    return row
+
+
+def post_bulk(client, rows):
+    response = client.post('/vehicles/bulk', json=rows, headers=auth_header('boss', admin=True))
+    assert response.status_code == 200
+    return response.get_json()
+
+
+def test_strings_longer_than_their_column_are_rejected_up_front(app, client):
+    with app.app_context():
+        make_vehicle(category='SUV')
+    result = post_bulk(client, [bulk_row(0), bulk_row(1, name='x' * 101), bulk_row(2, fuel_type='y' * 51)])
+
+    assert result['created'] == 1
+    assert [(e['index'], e['error']) for e in result['errors']] == [
+        (1, 'name must be at most 100 characters'),
+        (2, 'fuel_type must be at most 50 characters')
+    ]
+
+
+def test_database_rejection_fails_only_the_offending_row(app, client):
+    with app.app_context():
+        make_vehicle(category='SUV')
+        # Stand-in for any constraint the database enforces beyond request validation
+        db.session.execute(text(
+            "CREATE TRIGGER reject_vehicle BEFORE INSERT ON vehicle WHEN NEW.name = 'Rejected' "
+            "BEGIN SELECT RAISE(ABORT, 'rejected'); END"
+        ))
+        db.session.commit()
+
+    rows = [bulk_row(n) for n in range(10)]
+    rows[6]['name'] = 'Rejected'
+    result = post_bulk(client, rows)
+
+    assert result['created'] == 9
+    assert result['errors'] == [{'index': 6, 'external_id': 'fleet-6', 'error': 'Database rejected this row'}]
+    with app.app_context():
+        assert Vehicle.query.filter(Vehicle.external_id.isnot(None)).count() == 9
@@ -1,7 +1,8 @@
 from flask import Blueprint, request, jsonify
 from flask_cors import cross_origin
-from models import db, User
-from views.firebase_config import verify_firebase_token  
+from views.firebase_config import token_digest, verify_firebase_token
+from views.identity import get_bearer_token, resolve_user
+from views.revocation import revoke_token
 
 
 auth_bp = Blueprint("auth_bp", __name__)
@@ -20,23 +21,8 @@ def verify_token():
     if not decoded_token:
         return jsonify({"error": "Invalid token"}), 401
     
-    # Check if user exists in your database
-    firebase_uid = decoded_token.get('uid')
-    user = User.query.filter_by(firebase_uid=firebase_uid).first()
-    
-    if not user:
-        # Create new user if doesn't exist
-        email = decoded_token.get('email')
-        name = decoded_token.get('name', email.split('@')[0])
-        
-        new_user = User(
-            firebase_uid=firebase_uid,
-            name=name,
-            email=email
-        )
-        db.session.add(new_user)
-        db.session.commit()
-        user = new_user
+    # Look up the user, creating it on first sign-in
+    user = resolve_user(decoded_token, create=True)
     
     return jsonify({
         "message": "Authentication successful",
@@ -54,17 +40,15 @@ def current_user():
     if request.method == "OPTIONS":
         return '', 200
     
-    auth_header = request.headers.get('Authorization')
-    if not auth_header or not auth_header.startswith('Bearer '):
+    id_token = get_bearer_token()
+    if not id_token:
         return jsonify({"error": "Authorization header missing"}), 401
     
-    id_token = auth_header.split(' ')[1]
     decoded_token = verify_firebase_token(id_token)
     if not decoded_token:
         return jsonify({"error": "Invalid token"}), 401
     
-    firebase_uid = decoded_token.get('uid')
-    user = User.query.filter_by(firebase_uid=firebase_uid).first()
+    user = resolve_user(decoded_token)
     if not user:
         return jsonify({"error": "User not found"}), 404
     
@@ -73,4 +57,21 @@ def current_user():
         "name": user.name,
         "email": user.email,
         "is_admin": user.is_admin
-    }), 200
\ No newline at end of file
+    }), 200
+
+@auth_bp.route("/logout", methods=["POST", "OPTIONS"])
+@cross_origin(supports_credentials=True)
+def logout():
+    if request.method == "OPTIONS":
+        return '', 200
+
+    id_token = get_bearer_token()
+    if not id_token:
+        return jsonify({"error": "Authorization header missing"}), 401
+
+    # Only valid tokens are worth blocklisting; the rest are rejected anyway
+    if not verify_firebase_token(id_token):
+        return jsonify({"error": "Invalid token"}), 401
+
+    revoke_token(token_digest(id_token))
+    return jsonify({"message": "Logged out"}), 200
@@ -0,0 +1,98 @@
+from sqlalchemy import and_, exists, or_, select
+from sqlalchemy.exc import DBAPIError
+from models import db, Booking, Vehicle
+
+# Booking dates are inclusive on both ends (see Booking.calculate_total), so two
+# ranges conflict when each one starts on or before the day the other ends.
+# Lookups are served by ix_booking_vehicle_end_start: for a given vehicle the
+# index seeks straight to bookings ending on/after the requested start, which
+# skips the vehicle's entire booking history.
+
+
+def active_overlap(start_date, end_date):
+    """Filter clause matching non-cancelled bookings that overlap [start_date, end_date]."""
+    return and_(
+        Booking.end_date >= start_date,
+        Booking.start_date <= end_date,
+        # Rows from before booking_status existed hold NULL, and `NULL <> 'cancelled'`
+        # is not true: without the IS NULL branch they would never block a booking
+        or_(Booking.booking_status.is_(None), Booking.booking_status != 'cancelled')
+    )
+
+
+def is_vehicle_free(vehicle_id, start_date, end_date):
+    """True when the vehicle has no active booking overlapping [start_date, end_date]."""
+    conflict = exists().where(
+        Booking.vehicle_id == vehicle_id,
+        active_overlap(start_date, end_date)
+    )
+    return not db.session.query(conflict).scalar()
+
+
+def vehicle_is_free_clause(start_date, end_date):
+    """Correlated NOT EXISTS clause for filtering Vehicle queries by free dates."""
+    return ~exists().where(
+        Booking.vehicle_id == Vehicle.id,
+        active_overlap(start_date, end_date)
+    )
+
+
+def free_vehicle_ids(start_date, end_date, vehicle_ids=None):
+    """IDs of vehicles free for [start_date, end_date], answered as one anti-join."""
+    stmt = select(Vehicle.id).where(vehicle_is_free_clause(start_date, end_date))
+    if vehicle_ids is not None:
+        stmt = stmt.where(Vehicle.id.in_(vehicle_ids))
+    return {row[0] for row in db.session.execute(stmt)}
+
+
+def bookable_vehicle_ids(start_date, end_date, vehicle_ids):
+    """IDs among `vehicle_ids` that are listed as available and free for [start_date, end_date]."""
+    stmt = select(Vehicle.id).where(
+        Vehicle.id.in_(vehicle_ids),
+        Vehicle.availability.is_(True),
+        vehicle_is_free_clause(start_date, end_date)
+    )
+    return {row[0] for row in db.session.execute(stmt)}
+
+
+def lock_vehicle(vehicle_id):
+    """Load a vehicle with SELECT ... FOR UPDATE so concurrent bookings for it serialize.
+
+    The lock is held until the surrounding transaction commits or rolls back.
+    Databases without row locks (SQLite) ignore the FOR UPDATE clause.
+    """
+    return Vehicle.query.filter_by(id=vehicle_id).with_for_update().first()
+
+
+def lock_vehicles(vehicle_ids):
+    """Lock several vehicles at once (in id order) and return them keyed by id."""
+    if not vehicle_ids:
+        return {}
+    vehicles = Vehicle.query.filter(Vehicle.id.in_(vehicle_ids)).order_by(Vehicle.id).with_for_update().all()
+    return {vehicle.id: vehicle for vehicle in vehicles}
+
+
+def booked_ranges(vehicle_ids, start_date, end_date):
+    """Active (start, end) ranges per vehicle overlapping [start_date, end_date], from one query."""
+    ranges = {}
+    if not vehicle_ids:
+        return ranges
+    rows = db.session.query(Booking.vehicle_id, Booking.start_date, Booking.end_date).filter(
+        Booking.vehicle_id.in_(vehicle_ids),
+        active_overlap(start_date, end_date)
+    )
+    for vehicle_id, start, end in rows:
+        ranges.setdefault(vehicle_id, []).append((start, end))
+    return ranges
+
+
+# Postgres SQLSTATEs meaning "another booking won": the booking_no_overlap
+# exclusion constraint, deadlocks, serialization failures and lock timeouts
+BOOKING_CONFLICT_SQLSTATES = {'23P01', '40P01', '40001', '55P03'}
+
+
+def is_booking_conflict(error):
+    """True when a database error reports a double booking or lost lock race, not a bug."""
+    if not isinstance(error, DBAPIError):
+        return False
+    return getattr(error.orig, 'pgcode', None) in BOOKING_CONFLICT_SQLSTATES
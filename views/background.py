@@ -0,0 +1,32 @@
+import os
+import threading
+
+
+class ProcessThread:
+    """A daemon thread that runs at most once per process.
+
+    Threads do not survive fork, so a gunicorn worker that inherits this
+    object from the master starts its own thread on first use; later calls
+    are a pid comparison.
+    """
+
+    def __init__(self, name):
+        self.name = name
+        self._pid = None
+        self._lock = threading.Lock()
+
+    def ensure_started(self, start):
+        """Call `start()` and run the callable it returns on a daemon thread, unless already running here.
+
+        `start` runs in the calling thread under the lock, so whatever the
+        thread relies on from the outset (a subscription, the first keys) is
+        ready when this returns. If it raises, the next call tries again.
+        """
+        if self._pid == os.getpid():
+            return
+        with self._lock:
+            if self._pid == os.getpid():
+                return
+            target = start()
+            threading.Thread(target=target, name=self.name, daemon=True).start()
+            self._pid = os.getpid()
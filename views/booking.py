@@ -1,9 +1,20 @@
 from flask import Blueprint, request, jsonify
+from sqlalchemy import insert, tuple_
+from sqlalchemy.exc import DBAPIError
 from models import db, Booking, Vehicle, User
-from views.firebase_config import verify_firebase_token
+from views.identity import admin_required, firebase_auth_required, is_admin
+from views.availability import (
+    bookable_vehicle_ids, booked_ranges, is_booking_conflict, is_vehicle_free, lock_vehicle, lock_vehicles
+)
+from views.cache import bump_version
+from views.pricing import build_quote, price_factors, pricing_rules, quote_vehicle, quote_vehicles
+from views.serializers import admin_booking_serializer, booking_detail_serializer, my_booking_serializer
+from views.pagination import decode_cursor, encode_cursor, parse_limit, wants_page
+from views.streaming import (
+    STREAM_BATCH_SIZE, csv_lines, export_response, json_array_response, ndjson_lines, ndjson_response
+)
 from datetime import datetime
 import logging
-from functools import wraps
 
 booking_bp = Blueprint('booking_bp', __name__)
 
@@ -11,45 +22,54 @@ booking_bp = Blueprint('booking_bp', __name__)
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
-def firebase_auth_required(f):
-    """Custom decorator for Firebase authentication"""
-    @wraps(f)
-    def decorated_function(*args, **kwargs):
-        # Allow preflight requests to pass through
-        if request.method == 'OPTIONS':
-            return jsonify({'message': 'Preflight OK'}), 200
-
-        auth_header = request.headers.get('Authorization')
-        if not auth_header:
-            return jsonify({'error': 'No authorization header'}), 401
-        
-        try:
-            token = auth_header.split(' ')[1]
-            decoded_token = verify_firebase_token(token)
-            if not decoded_token:
-                return jsonify({'error': 'Invalid token'}), 401
-
-            firebase_uid = decoded_token['uid']
-            user = User.query.filter_by(firebase_uid=firebase_uid).first()
-
-            if not user:
-                user = User(
-                    firebase_uid=firebase_uid,
-                    name=decoded_token.get('name', ''),
-                    email=decoded_token.get('email', ''),
-                    is_admin=False
-                )
-                db.session.add(user)
-                db.session.commit()
+REQUIRED_BOOKING_FIELDS = [
+    'vehicle_id', 'start_date', 'end_date', 'full_name', 'phone',
+    'email', 'id_number', 'driving_license', 'pickup_option',
+    'payment_method'
+]
 
-            request.current_user = user
 
-        except Exception as e:
-            logger.error(f"Authentication error: {str(e)}")
-            return jsonify({'error': 'Authentication failed'}), 401
+def parse_booking_dates(data):
+    """Validate a booking's start/end dates; raises ValueError with a client-facing message."""
+    try:
+        start = datetime.strptime(data['start_date'], '%Y-%m-%d').date()
+        end = datetime.strptime(data['end_date'], '%Y-%m-%d').date()
+    except (TypeError, ValueError):
+        raise ValueError('Invalid date format. Use YYYY-MM-DD')
+    if start >= end:
+        raise ValueError('End date must be after start date')
+    if start < datetime.now().date():
+        raise ValueError('Start date cannot be in the past')
+    return start, end
+
+
+def is_id(value):
+    # bool is a subclass of int, but true/false are never row ids
+    return isinstance(value, int) and not isinstance(value, bool)
+
+
+def booking_values(data, user_id, start, end, quote):
+    """Column values for a new pending booking, priced by `quote`."""
+    return {
+        'user_id': user_id,
+        'vehicle_id': data['vehicle_id'],
+        'start_date': start,
+        'end_date': end,
+        'full_name': data['full_name'],
+        'phone': data['phone'],
+        'email': data['email'],
+        'id_number': data['id_number'],
+        'driving_license': data['driving_license'],
+        'pickup_option': data['pickup_option'],
+        'delivery_address': data.get('delivery_address'),
+        'need_driver': bool(data.get('need_driver', False)),
+        'special_requests': data.get('special_requests', ''),
+        'payment_method': data['payment_method'],
+        'total_price': quote['total_price'],
+        'driver_fee': quote['driver_fee'],
+        'booking_status': 'pending'
+    }
 
-        return f(*args, **kwargs)
-    return decorated_function
 
 @booking_bp.route('/', methods=['POST', 'OPTIONS'])
 @firebase_auth_required
@@ -61,91 +81,219 @@ def create_booking():
             return jsonify({'error': 'User not found'}), 404
 
         data = request.get_json()
-        logger.info(f"Received booking data: {data}")
-
-        required_fields = [
-            'vehicle_id', 'start_date', 'end_date', 'full_name', 'phone',
-            'email', 'id_number', 'driving_license', 'pickup_option',
-            'payment_method', 'total_price'
-        ]
-        missing_fields = [field for field in required_fields if field not in data]
+        # Never log the payload itself: it carries addresses and phone numbers
+        logger.info(f"Booking request from user {user.id} for vehicle {data.get('vehicle_id')}")
+
+        missing_fields = [field for field in REQUIRED_BOOKING_FIELDS if field not in data]
         if missing_fields:
             logger.error(f"Missing required fields: {missing_fields}")
             return jsonify({'error': f'Missing required fields: {", ".join(missing_fields)}'}), 400
 
-        vehicle = Vehicle.query.get(data['vehicle_id'])
+        # Row lock serializes concurrent bookings for this vehicle until commit
+        vehicle = lock_vehicle(data['vehicle_id'])
         if not vehicle or not vehicle.availability:
             logger.error(f"Vehicle not available: {data['vehicle_id']}")
             return jsonify({'error': 'Vehicle not available'}), 404
 
         try:
-            start = datetime.strptime(data['start_date'], '%Y-%m-%d')
-            end = datetime.strptime(data['end_date'], '%Y-%m-%d')
-            if start >= end:
-                return jsonify({'error': 'End date must be after start date'}), 400
-            if start.date() < datetime.now().date():
-                return jsonify({'error': 'Start date cannot be in the past'}), 400
+            start, end = parse_booking_dates(data)
         except ValueError as e:
-            return jsonify({'error': 'Invalid date format. Use YYYY-MM-DD'}), 400
+            return jsonify({'error': str(e)}), 400
 
         if data['pickup_option'] == 'delivery' and not data.get('delivery_address'):
             return jsonify({'error': 'Delivery address is required for delivery option'}), 400
 
-        new_booking = Booking(
-            user_id=user.id,
-            vehicle_id=data['vehicle_id'],
-            start_date=start.date(),
-            end_date=end.date(),
-            full_name=data['full_name'],
-            phone=data['phone'],
-            email=data['email'],
-            id_number=data['id_number'],
-            driving_license=data['driving_license'],
-            pickup_option=data['pickup_option'],
-            delivery_address=data.get('delivery_address'),
-            need_driver=data.get('need_driver', False),
-            special_requests=data.get('special_requests', ''),
-            payment_method=data['payment_method'],
-            total_price=data['total_price'],
-            driver_fee=data.get('driver_fee', 0),
-            booking_status='pending'
-        )
+        if not is_vehicle_free(vehicle.id, start, end):
+            logger.info(f"Vehicle {vehicle.id} already booked for {start} - {end}")
+            return jsonify({'error': 'Vehicle is already booked for the selected dates'}), 409
+
+        # Prices come from the vehicle's daily rate; client-sent totals are ignored
+        need_driver = bool(data.get('need_driver', False))
+        quote = quote_vehicle(vehicle, start, end, need_driver)
+
+        new_booking = Booking(**booking_values(data, user.id, start, end, quote))
 
         db.session.add(new_booking)
         db.session.commit()
+        bump_version('bookings')
 
         logger.info(f"Booking created successfully: {new_booking.id}")
         return jsonify({
             'message': 'Booking request submitted successfully',
             'booking_id': new_booking.id,
-            'status': 'pending'
+            'status': 'pending',
+            'total_price': new_booking.total_price
         }), 201
 
     except Exception as e:
         db.session.rollback()
+        if is_booking_conflict(e):
+            logger.info(f"Booking conflict detected by the database: {e.orig.pgcode}")
+            return jsonify({'error': 'Vehicle is already booked for the selected dates'}), 409
         logger.error(f"Error creating booking: {str(e)}", exc_info=True)
-        return jsonify({'error': f'Failed to create booking: {str(e)}'}), 500
+        return jsonify({'error': 'Failed to create booking'}), 500
+
+# Largest batch accepted by the batch booking endpoint
+MAX_BOOKING_BATCH = 500
+
+
+@booking_bp.route('/batch', methods=['POST', 'OPTIONS'])
+@firebase_auth_required
+def create_bookings_batch():
+    """Create many bookings for the caller with one vehicle query, one insert and one commit.
+
+    Each item is validated and conflict-checked (against stored bookings and
+    earlier items in the same batch) independently; valid items are created and
+    the response reports a result per item. With "atomic": true nothing is
+    created unless every item is valid: the answer is 409 when the only problem
+    is dates already taken, 400 when any item is itself invalid.
+    """
+    user = request.current_user
+    data = request.get_json(silent=True)
+    if not isinstance(data, dict):
+        return jsonify({'error': 'Body must be a JSON object with a bookings list'}), 400
+    items = data.get('bookings')
+    if not isinstance(items, list) or not items:
+        return jsonify({'error': 'bookings must be a non-empty list'}), 400
+    if len(items) > MAX_BOOKING_BATCH:
+        return jsonify({'error': f'At most {MAX_BOOKING_BATCH} bookings per batch'}), 400
+
+    results = [None] * len(items)
+    accepted = []
+    for index, item in enumerate(items):
+        if not isinstance(item, dict):
+            results[index] = {'index': index, 'status': 'error', 'error': 'Booking must be an object'}
+            continue
+        missing_fields = [field for field in REQUIRED_BOOKING_FIELDS if field not in item]
+        if missing_fields:
+            results[index] = {'index': index, 'status': 'error',
+                              'error': f'Missing required fields: {", ".join(missing_fields)}'}
+            continue
+        if not is_id(item['vehicle_id']):
+            results[index] = {'index': index, 'status': 'error', 'error': 'vehicle_id must be an integer'}
+            continue
+        try:
+            start, end = parse_booking_dates(item)
+        except ValueError as e:
+            results[index] = {'index': index, 'status': 'error', 'error': str(e)}
+            continue
+        if item['pickup_option'] == 'delivery' and not item.get('delivery_address'):
+            results[index] = {'index': index, 'status': 'error',
+                              'error': 'Delivery address is required for delivery option'}
+            continue
+        accepted.append((index, item, start, end))
+
+    try:
+        # One locked read for every referenced vehicle, in id order to avoid deadlocks
+        vehicle_ids = sorted({item['vehicle_id'] for _, item, _, _ in accepted})
+        vehicles = lock_vehicles(vehicle_ids)
+        booked = {}
+        if accepted:
+            booked = booked_ranges(vehicle_ids, min(s for _, _, s, _ in accepted), max(e for _, _, _, e in accepted))
+
+        rows = []
+        factors = {}
+        conflicts = set()
+        for index, item, start, end in accepted:
+            vehicle = vehicles.get(item['vehicle_id'])
+            if not vehicle or not vehicle.availability:
+                results[index] = {'index': index, 'status': 'error', 'error': 'Vehicle not available'}
+                continue
+            ranges = booked.setdefault(vehicle.id, [])
+            if any(s <= end and e >= start for s, e in ranges):
+                results[index] = {'index': index, 'status': 'error',
+                                  'error': 'Vehicle is already booked for the selected dates'}
+                conflicts.add(index)
+                continue
+            ranges.append((start, end))
+
+            need_driver = bool(item.get('need_driver', False))
+            if (start, end) not in factors:
+                factors[(start, end)] = price_factors(start, end, pricing_rules())
+            quote = build_quote(vehicle.id, vehicle.price, factors[(start, end)], need_driver)
+            rows.append((index, booking_values(item, user.id, start, end, quote)))
+
+        failed = [r for r in results if r is not None]
+        if data.get('atomic') and failed:
+            db.session.rollback()
+            # Retrying other dates can fix a conflict; a malformed item needs a corrected request
+            status = 409 if all(r['index'] in conflicts for r in failed) else 400
+            return jsonify({'created': 0, 'failed': len(failed), 'results': failed}), status
+
+        if rows:
+            inserted = db.session.execute(
+                insert(Booking).returning(Booking.id, sort_by_parameter_order=True),
+                [values for _, values in rows]
+            ).scalars().all()
+            db.session.commit()
+            bump_version('bookings')
+            for (index, values), booking_id in zip(rows, inserted):
+                results[index] = {'index': index, 'status': 'created', 'booking_id': booking_id,
+                                  'total_price': values['total_price']}
+        else:
+            db.session.rollback()
+
+    except Exception as e:
+        db.session.rollback()
+        if is_booking_conflict(e):
+            # A concurrent request took some of these dates; the whole insert was rolled back
+            logger.info(f"Booking batch conflict detected by the database: {e.orig.pgcode}")
+            return jsonify({'error': 'Some vehicles were booked concurrently, nothing was created. Retry the batch.'}), 409
+        # The error text would echo up to 500 customers' details back to the caller
+        logger.error(f"Error creating booking batch: {type(e).__name__}", exc_info=True)
+        return jsonify({'error': 'Failed to create bookings'}), 500
+
+    created = sum(1 for r in results if r['status'] == 'created')
+    logger.info(f"Booking batch by user {user.id}: {created} created, {len(results) - created} failed")
+    return jsonify({'created': created, 'failed': len(results) - created, 'results': results}), 200
+
+# Largest batch accepted by the quote endpoint
+MAX_QUOTE_BATCH = 500
+
+
+# Public: price one vehicle (`vehicle_id`) or a search page (`vehicle_ids`) for a date range
+@booking_bp.route('/quote', methods=['POST'])
+def quote_booking():
+    data = request.get_json(silent=True) or {}
+    try:
+        start, end = parse_booking_dates(data)
+    except (KeyError, ValueError) as e:
+        message = str(e) if isinstance(e, ValueError) else 'start_date and end_date are required'
+        return jsonify({'error': message}), 400
+    need_driver = bool(data.get('need_driver', False))
+
+    if 'vehicle_ids' in data:
+        vehicle_ids = data['vehicle_ids']
+        if not isinstance(vehicle_ids, list) or not all(is_id(v) for v in vehicle_ids):
+            return jsonify({'error': 'vehicle_ids must be a list of integers'}), 400
+        if len(vehicle_ids) > MAX_QUOTE_BATCH:
+            return jsonify({'error': f'At most {MAX_QUOTE_BATCH} vehicles per quote'}), 400
+        quotes = quote_vehicles(vehicle_ids, start, end, need_driver)
+        bookable = bookable_vehicle_ids(start, end, vehicle_ids)
+        return jsonify({'quotes': [
+            dict(quotes[v], available=v in bookable) for v in vehicle_ids if v in quotes
+        ]}), 200
+
+    vehicle_id = data.get('vehicle_id')
+    if not is_id(vehicle_id):
+        return jsonify({'error': 'vehicle_id or vehicle_ids is required'}), 400
+    vehicle = db.session.get(Vehicle, vehicle_id)
+    if not vehicle:
+        return jsonify({'error': 'Vehicle not found'}), 404
+    # The cached quote is shared, so availability goes on a copy
+    quote = dict(quote_vehicle(vehicle, start, end, need_driver))
+    quote['available'] = vehicle.id in bookable_vehicle_ids(start, end, [vehicle.id])
+    return jsonify(quote), 200
 
 @booking_bp.route('/my', methods=['GET'])
 @firebase_auth_required
 def get_my_bookings():
     user = request.current_user
-    bookings = Booking.query.filter_by(user_id=user.id).all()
-    return jsonify([
-        {
-            'id': b.id,
-            'vehicle': b.vehicle.name,
-            'start_date': b.start_date.isoformat(),
-            'end_date': b.end_date.isoformat(),
-            'status': b.booking_status,
-            'full_name': b.full_name,
-            'phone': b.phone,
-            'pickup_option': b.pickup_option,
-            'need_driver': b.need_driver,
-            'payment_method': b.payment_method,
-            'total_price': b.total_price
-        } for b in bookings
-    ]), 200
+    # One joined, column-level query instead of a lazy vehicle load per row
+    bookings = db.session.query(*my_booking_serializer.columns) \
+        .join(Vehicle, Booking.vehicle_id == Vehicle.id).filter(Booking.user_id == user.id) \
+        .order_by(Booking.created_at.desc(), Booking.id.desc()).all()
+    return jsonify(my_booking_serializer.many(bookings)), 200
 
 @booking_bp.route('/<int:booking_id>/cancel', methods=['PATCH'])
 @firebase_auth_required
@@ -161,49 +309,144 @@ def cancel_booking(booking_id):
 
     booking.booking_status = 'cancelled'
     db.session.commit()
+    bump_version('bookings')
     return jsonify({'message': 'Booking cancelled'}), 200
 
-@booking_bp.route('/', methods=['GET'])
-@firebase_auth_required
-def get_all_bookings():
-    user = request.current_user
-    if not user or not user.is_admin:
-        return jsonify({'error': 'Admins only'}), 403
+def parse_date_arg(name):
+    value = request.args.get(name)
+    if not value:
+        return None
+    try:
+        return datetime.strptime(value, '%Y-%m-%d').date()
+    except ValueError:
+        raise ValueError(f'Invalid {name}. Use YYYY-MM-DD')
 
-    user_filter = request.args.get('user_id')
+
+def filter_admin_bookings(query):
+    """Apply the admin listing/export filters from the query string."""
+    user_filter = request.args.get('user_id', type=int)
+    vehicle_filter = request.args.get('vehicle_id', type=int)
     status_filter = request.args.get('status')
+    payment_filter = request.args.get('payment_status')
+    start_date = parse_date_arg('start_date')
+    end_date = parse_date_arg('end_date')
 
-    query = Booking.query
     if user_filter:
-        query = query.filter_by(user_id=user_filter)
+        query = query.filter(Booking.user_id == user_filter)
+    if vehicle_filter:
+        query = query.filter(Booking.vehicle_id == vehicle_filter)
     if status_filter:
-        query = query.filter_by(booking_status=status_filter)
-
-    bookings = query.all()
-    return jsonify([
-        {
-            'id': b.id,
-            'user': b.user.name,
-            'vehicle': b.vehicle.name,
-            'start_date': b.start_date.isoformat(),
-            'end_date': b.end_date.isoformat(),
-            'status': b.booking_status,
-            'full_name': b.full_name,
-            'phone': b.phone,
-            'email': b.email,
-            'pickup_option': b.pickup_option,
-            'need_driver': b.need_driver,
-            'payment_method': b.payment_method,
-            'total_price': b.total_price
-        } for b in bookings
-    ]), 200
+        query = query.filter(Booking.booking_status == status_filter)
+    if payment_filter:
+        query = query.filter(Booking.payment_status == payment_filter)
+    # Date range keeps bookings overlapping [start_date, end_date]; either end may be open
+    if start_date:
+        query = query.filter(Booking.end_date >= start_date)
+    if end_date:
+        query = query.filter(Booking.start_date <= end_date)
+    return query
+
+
+def admin_bookings_query():
+    """Filtered admin booking listing ordered by its (created_at, id) keyset."""
+    # User and vehicle names come from joins, so the statement count is constant
+    query = db.session.query(
+        *admin_booking_serializer.columns,
+        Booking.created_at.label('cursor_created_at'), Booking.id.label('cursor_id')
+    ).join(User, Booking.user_id == User.id).join(Vehicle, Booking.vehicle_id == Vehicle.id)
+    query = filter_admin_bookings(query)
+
+    cursor = request.args.get('cursor')
+    if cursor:
+        created_at, booking_id = decode_cursor(cursor, 2)
+        try:
+            created_at = datetime.fromisoformat(created_at)
+        except (TypeError, ValueError):
+            raise ValueError('Invalid cursor')
+        if not isinstance(booking_id, int):
+            raise ValueError('Invalid cursor')
+        query = query.filter(tuple_(Booking.created_at, Booking.id) > tuple_(created_at, booking_id))
+
+    return query.order_by(Booking.created_at, Booking.id)
+
+
+@booking_bp.route('/', methods=['GET'])
+@admin_required
+def get_all_bookings():
+
+    try:
+        query = admin_bookings_query()
+        paginate = wants_page()
+        limit = parse_limit() if paginate else None
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+
+    # Streaming mode: rows leave as they come off a server-side cursor
+    if request.args.get('format') == 'ndjson':
+        if paginate:
+            query = query.limit(limit)
+        return ndjson_response(query.yield_per(STREAM_BATCH_SIZE), admin_booking_serializer)
+
+    if not paginate:
+        return json_array_response(query.yield_per(STREAM_BATCH_SIZE), admin_booking_serializer)
+
+    bookings = query.limit(limit + 1).all()
+    next_cursor = None
+    if len(bookings) > limit:
+        bookings = bookings[:limit]
+        next_cursor = encode_cursor([bookings[-1].cursor_created_at.isoformat(), bookings[-1].cursor_id])
+    return jsonify({
+        'bookings': admin_booking_serializer.many(bookings),
+        'next_cursor': next_cursor
+    }), 200
+
+# Columns written by the finance export, in output order
+EXPORT_COLUMNS = [
+    Booking.id, Booking.user_id, Booking.vehicle_id, Booking.start_date, Booking.end_date,
+    Booking.total_price, Booking.driver_fee, Booking.need_driver, Booking.pickup_option,
+    Booking.payment_method, Booking.payment_status, Booking.booking_status,
+    Booking.created_at, Booking.updated_at
+]
+
+
+@booking_bp.route('/export', methods=['GET'])
+@admin_required
+def export_bookings():
+
+    export_format = request.args.get('format', 'csv')
+    if export_format not in ('csv', 'ndjson'):
+        return jsonify({'error': 'format must be csv or ndjson'}), 400
+    include_names = request.args.get('include_names') == 'true'
+
+    columns = list(EXPORT_COLUMNS)
+    if include_names:
+        columns += [User.name.label('user_name'), Vehicle.name.label('vehicle_name')]
+    query = db.session.query(*columns).select_from(Booking)
+    if include_names:
+        query = query.outerjoin(User, Booking.user_id == User.id) \
+            .outerjoin(Vehicle, Booking.vehicle_id == Vehicle.id)
+    try:
+        query = filter_admin_bookings(query)
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+
+    # Plain tuples off a server-side cursor: no ORM identity map, flat memory
+    rows = query.order_by(Booking.id).yield_per(STREAM_BATCH_SIZE).tuples()
+    header = [c.key for c in columns]
+    if export_format == 'csv':
+        chunks = csv_lines(header, rows)
+        mimetype = 'text/csv'
+    else:
+        chunks = ndjson_lines(rows, lambda row: dict(zip(header, row)))
+        mimetype = 'application/x-ndjson'
+
+    filename = f'bookings-{datetime.utcnow():%Y%m%d%H%M%S}.{export_format}'
+    return export_response(chunks, mimetype, filename)
+
 
 @booking_bp.route('/<int:booking_id>/status', methods=['PATCH'])
-@firebase_auth_required
+@admin_required
 def update_booking_status(booking_id):
-    user = request.current_user
-    if not user or not user.is_admin:
-        return jsonify({'error': 'Admins only'}), 403
 
     data = request.get_json()
     new_status = data.get('status')
@@ -215,8 +458,21 @@ def update_booking_status(booking_id):
     if not booking:
         return jsonify({'error': 'Booking not found'}), 404
 
+    # Reactivating a cancelled booking must not overlap bookings made since
+    if booking.booking_status == 'cancelled' and new_status != 'cancelled':
+        lock_vehicle(booking.vehicle_id)
+        if not is_vehicle_free(booking.vehicle_id, booking.start_date, booking.end_date):
+            return jsonify({'error': 'Vehicle is already booked for the selected dates'}), 409
+
     booking.booking_status = new_status
-    db.session.commit()
+    try:
+        db.session.commit()
+    except DBAPIError as e:
+        db.session.rollback()
+        if is_booking_conflict(e):
+            return jsonify({'error': 'Vehicle is already booked for the selected dates'}), 409
+        raise
+    bump_version('bookings')
     return jsonify({'message': 'Booking status updated'}), 200
 
 @booking_bp.route('/<int:booking_id>', methods=['GET'])
@@ -227,42 +483,16 @@ def get_booking(booking_id):
         if not user:
             return jsonify({'error': 'User not found'}), 404
 
-        booking = Booking.query.get(booking_id) if user.is_admin else Booking.query.filter_by(id=booking_id, user_id=user.id).first()
+        query = db.session.query(*booking_detail_serializer.columns) \
+            .join(Vehicle, Booking.vehicle_id == Vehicle.id).filter(Booking.id == booking_id)
+        if not is_admin():
+            query = query.filter(Booking.user_id == user.id)
+        booking = query.first()
         if not booking:
             return jsonify({'error': 'Booking not found'}), 404
 
-        booking_data = {
-            'id': booking.id,
-            'user_id': booking.user_id,
-            'vehicle_id': booking.vehicle_id,
-            'start_date': booking.start_date.isoformat(),
-            'end_date': booking.end_date.isoformat(),
-            'full_name': booking.full_name,
-            'phone': booking.phone,
-            'email': booking.email,
-            'id_number': booking.id_number,
-            'driving_license': booking.driving_license,
-            'pickup_option': booking.pickup_option,
-            'delivery_address': booking.delivery_address,
-            'need_driver': booking.need_driver,
-            'special_requests': booking.special_requests,
-            'payment_method': booking.payment_method,
-            'total_price': float(booking.total_price),
-            'driver_fee': float(booking.driver_fee) if booking.driver_fee else 0,
-            'booking_status': booking.booking_status,
-            'created_at': booking.created_at.isoformat() if hasattr(booking, 'created_at') else None,
-            'vehicle': {
-                'id': booking.vehicle.id,
-                'name': booking.vehicle.name,
-                'description': booking.vehicle.description,
-                'price': float(booking.vehicle.price),
-                'image_url': booking.vehicle.image_url if hasattr(booking.vehicle, 'image_url') else None,
-                'availability': booking.vehicle.availability
-            }
-        }
-
-        return jsonify(booking_data), 200
+        return jsonify(booking_detail_serializer(booking)), 200
 
     except Exception as e:
         logger.error(f"Error fetching booking {booking_id}: {str(e)}", exc_info=True)
-        return jsonify({'error': f'Failed to fetch booking: {str(e)}'}), 500
+        return jsonify({'error': 'Failed to fetch booking'}), 500
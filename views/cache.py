@@ -0,0 +1,419 @@
+from collections import OrderedDict
+from flask import current_app, has_app_context, request, Response
+from functools import wraps
+import hashlib
+import json
+import logging
+import os
+import pickle
+import threading
+import time
+import uuid
+
+logger = logging.getLogger(__name__)
+
+
+class MemoryCache:
+    """In-process LRU cache with per-entry TTL. Each worker process has its own copy."""
+
+    backend_name = 'memory'
+
+    def __init__(self, max_entries=10000):
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] is not None and entry[0] <= time.monotonic():
+                del self._entries[key]
+                entry = None
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[1]
+
+    def set(self, key, value, ttl=None):
+        with self._lock:
+            self._store(key, value, ttl)
+
+    def add(self, key, value, ttl=None):
+        """Set `key` only if it is absent; returns True when this call stored it."""
+        with self._lock:
+            if self._is_live(key):
+                return False
+            self._store(key, value, ttl)
+            return True
+
+    def exists(self, key):
+        """Whether `key` is present, without counting a hit or miss or refreshing its LRU position."""
+        with self._lock:
+            return self._is_live(key)
+
+    def _is_live(self, key):
+        entry = self._entries.get(key)
+        return entry is not None and (entry[0] is None or entry[0] > time.monotonic())
+
+    def _store(self, key, value, ttl):
+        # Callers hold self._lock
+        self._entries[key] = (time.monotonic() + ttl if ttl else None, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def delete(self, key):
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.hits = 0
+            self.misses = 0
+
+    def publish(self, kind, key):
+        # Single process: the only subscribers are local
+        dispatch_invalidation(kind, key)
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'backend': self.backend_name,
+                'size': len(self._entries),
+                'max_entries': self.max_entries,
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_rate': self.hits / lookups if lookups else 0.0
+            }
+
+
+class LocalSharedCache(MemoryCache):
+    """Embedded stand-in for a shared backend.
+
+    Every instance in the process reads and writes one store, so several apps
+    built in a test (or threads standing in for workers) observe each other's
+    writes and invalidation messages the way Redis-backed workers would.
+    """
+
+    backend_name = 'local'
+    _shared_entries = OrderedDict()
+    _shared_lock = threading.Lock()
+
+    def __init__(self, max_entries=10000):
+        super().__init__(max_entries)
+        self._entries = LocalSharedCache._shared_entries
+        self._lock = LocalSharedCache._shared_lock
+
+
+class RedisCache:
+    """Cache shared by every worker and node through Redis.
+
+    Needs the optional `redis` package (pip install redis); values are pickled.
+    Invalidation messages travel over a pub/sub channel, consumed by one
+    listener thread per worker process.
+    """
+
+    backend_name = 'redis'
+
+    def __init__(self, url, prefix='ach:'):
+        try:
+            import redis
+        except ImportError:
+            raise RuntimeError("CACHE_BACKEND=redis requires the 'redis' package")
+        self.client = redis.Redis.from_url(url)
+        self.prefix = prefix
+        self.channel = prefix + 'invalidate'
+        self.hits = 0
+        self.misses = 0
+        self._stats_lock = threading.Lock()
+        self._listener = ProcessThread('cache-invalidation')
+
+    def get(self, key):
+        raw = self.client.get(self.prefix + key)
+        with self._stats_lock:
+            if raw is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+        return pickle.loads(raw) if raw is not None else None
+
+    def set(self, key, value, ttl=None):
+        self.client.set(self.prefix + key, pickle.dumps(value), ex=int(ttl) if ttl else None)
+
+    def add(self, key, value, ttl=None):
+        return bool(self.client.set(self.prefix + key, pickle.dumps(value), ex=int(ttl) if ttl else None, nx=True))
+
+    def exists(self, key):
+        return bool(self.client.exists(self.prefix + key))
+
+    def delete(self, key):
+        self.client.delete(self.prefix + key)
+
+    def clear(self):
+        for key in self.client.scan_iter(match=self.prefix + '*'):
+            self.client.delete(key)
+        with self._stats_lock:
+            self.hits = 0
+            self.misses = 0
+
+    def publish(self, kind, key):
+        # Apply locally right away so this worker reads its own writes
+        dispatch_invalidation(kind, key)
+        self.client.publish(self.channel, json.dumps([kind, key]))
+
+    def ensure_listening(self):
+        self._listener.ensure_started(self._subscribe)
+
+    def _subscribe(self):
+        # Subscribed before the first request is served, so no message is missed
+        pubsub = self.client.pubsub(ignore_subscribe_messages=True)
+        pubsub.subscribe(self.channel)
+        return lambda: self._listen(pubsub)
+
+    def _listen(self, pubsub):
+        for message in pubsub.listen():
+            try:
+                kind, key = json.loads(message['data'])
+                dispatch_invalidation(kind, key)
+            except Exception as e:
+                logger.error(f"Bad invalidation message: {str(e)}")
+
+    def stats(self):
+        # Lookups made by this worker; the shared store itself is not sized here
+        with self._stats_lock:
+            lookups = self.hits + self.misses
+            return {
+                'backend': self.backend_name,
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_rate': self.hits / lookups if lookups else 0.0
+            }
+
+
+def make_cache(config):
+    backend = config.get('CACHE_BACKEND', 'memory')
+    if backend == 'memory':
+        return MemoryCache(max_entries=config.get('CACHE_MAX_ENTRIES', 10000))
+    if backend == 'local':
+        return LocalSharedCache(max_entries=config.get('CACHE_MAX_ENTRIES', 10000))
+    if backend == 'redis':
+        return RedisCache(config['CACHE_REDIS_URL'])
+    raise ValueError(f'Unknown CACHE_BACKEND: {backend}')
+
+
+def init_cache(app):
+    app.extensions['cache'] = make_cache(app.config)
+
+
+def get_cache():
+    cache = current_app.extensions['cache']
+    if hasattr(cache, 'ensure_listening'):
+        cache.ensure_listening()
+    return cache
+
+
+# Invalidation messages: `kind` names a process-local cache, `key` an entry in it.
+# Handlers run in every worker that receives the message.
+_invalidation_handlers = {}
+
+
+def on_invalidation(kind, handler):
+    _invalidation_handlers.setdefault(kind, []).append(handler)
+
+
+def dispatch_invalidation(kind, key):
+    for handler in _invalidation_handlers.get(kind, []):
+        handler(key)
+
+
+def publish_invalidation(kind, key):
+    """Tell every worker to drop `key` from its local `kind` cache."""
+    if has_app_context():
+        get_cache().publish(kind, key)
+    else:
+        dispatch_invalidation(kind, key)
+
+
+# Stampede protection. Within a process the first caller to miss a key computes
+# it while the others wait on an Event set the moment it finishes. Across
+# workers that caller also takes a short cache-level lock (atomic add), and a
+# worker that finds the lock taken polls until the holder is done.
+SINGLE_FLIGHT_TIMEOUT = 10
+SINGLE_FLIGHT_POLL = 0.05
+_flights = {}  # (cache id, key) -> Event set when this process's computation ends
+_flights_lock = threading.Lock()
+
+
+def get_or_compute(key, compute, ttl=None):
+    """Return the cached value for `key`, computing it at most once across callers.
+
+    `compute` returning None means "do not cache"; that None is passed through.
+    Callers that lose the race wait only while the winner is still computing:
+    if it finishes without caching anything they compute for themselves.
+    """
+    cache = get_cache()
+    value = cache.get(key)
+    if value is not None:
+        return value
+
+    flight_key = (id(cache), key)
+    with _flights_lock:
+        flight = _flights.get(flight_key)
+        leader = flight is None
+        if leader:
+            flight = _flights[flight_key] = threading.Event()
+
+    if not leader:
+        flight.wait(SINGLE_FLIGHT_TIMEOUT)
+        value = cache.get(key)
+        return value if value is not None else compute_and_store(cache, key, compute, ttl)
+
+    try:
+        return compute_once_across_workers(cache, key, compute, ttl)
+    finally:
+        with _flights_lock:
+            _flights.pop(flight_key, None)
+        flight.set()
+
+
+def compute_once_across_workers(cache, key, compute, ttl):
+    lock_key = f'lock:{key}'
+    holds_lock = cache.add(lock_key, os.getpid(), ttl=SINGLE_FLIGHT_TIMEOUT)
+    if not holds_lock:
+        # exists() leaves the hit/miss counters alone, so polling does not skew them
+        deadline = time.monotonic() + SINGLE_FLIGHT_TIMEOUT
+        while time.monotonic() < deadline and cache.exists(lock_key):
+            time.sleep(SINGLE_FLIGHT_POLL)
+        value = cache.get(key)
+        if value is not None:
+            return value
+    try:
+        return compute_and_store(cache, key, compute, ttl)
+    finally:
+        if holds_lock:
+            cache.delete(lock_key)
+
+
+def compute_and_store(cache, key, compute, ttl):
+    value = compute()
+    if value is not None:
+        cache.set(key, value, ttl)
+    return value
+
+
+# Response cache hit/miss counters for this worker
+response_stats = {'hits': 0, 'misses': 0, 'not_modified': 0}
+_stats_lock = threading.Lock()
+
+
+def _count(name):
+    with _stats_lock:
+        response_stats[name] += 1
+
+
+def cache_stats():
+    with _stats_lock:
+        stats = dict(response_stats)
+    lookups = stats['hits'] + stats['misses']
+    stats['hit_rate'] = stats['hits'] / lookups if lookups else 0.0
+    stats['store'] = get_cache().stats()
+    return stats
+
+
+# Namespace versions are random tokens rather than counters: if a version key is
+# ever evicted, the replacement token orphans the old entries instead of
+# resurrecting ones cached under an earlier value. Each worker memoises the
+# versions briefly; bump_version broadcasts a message that drops the memo.
+_version_memo = MemoryCache(max_entries=256)
+VERSION_MEMO_TTL = 5
+on_invalidation('namespace', _version_memo.delete)
+
+
+def namespace_version(namespace):
+    version = _version_memo.get(namespace)
+    if version is not None:
+        return version
+    cache = get_cache()
+    version = cache.get(f'version:{namespace}')
+    if version is None:
+        version = uuid.uuid4().hex[:12]
+        if not cache.add(f'version:{namespace}', version):
+            version = cache.get(f'version:{namespace}') or version
+    _version_memo.set(namespace, version, ttl=VERSION_MEMO_TTL)
+    return version
+
+
+def bump_version(namespace):
+    """Invalidate every cached response tagged with `namespace`, in all workers."""
+    cache = get_cache()
+    cache.set(f'version:{namespace}', uuid.uuid4().hex[:12])
+    cache.publish('namespace', namespace)
+
+
+def resolve_namespaces(namespaces):
+    """Expand callables among `namespaces` into the names they return for this request."""
+    resolved = []
+    for namespace in namespaces:
+        if callable(namespace):
+            resolved.extend(namespace())
+        else:
+            resolved.append(namespace)
+    return resolved
+
+
+def response_cache_key(namespaces):
+    versions = ','.join(f'{ns}={namespace_version(ns)}' for ns in namespaces)
+    args = '&'.join(f'{k}={v}' for k, v in sorted(request.args.items(multi=True)))
+    return f'response:{versions}:{request.path}?{args}'
+
+
+def cached_response(*namespaces):
+    """Cache a public GET view's 200 responses, tagged with `namespaces` for invalidation.
+
+    A namespace may also be a callable returning names, for views whose
+    dependencies vary with the request arguments.
+
+    Responses carry a strong ETag derived from the body, and requests whose
+    If-None-Match matches it get a bodyless 304. Concurrent misses for the same
+    key are collapsed into one render.
+    """
+    def decorator(f):
+        @wraps(f)
+        def decorated_function(*args, **kwargs):
+            rendered = {}
+
+            def render():
+                _count('misses')
+                rendered['fresh'] = True
+                rv = current_app.make_response(f(*args, **kwargs))
+                if rv.status_code != 200 or rv.is_streamed:
+                    rendered['response'] = rv
+                    return None
+                body = rv.get_data()
+                return (body, rv.mimetype, hashlib.sha1(body).hexdigest())
+
+            entry = get_or_compute(
+                response_cache_key(resolve_namespaces(namespaces)), render,
+                ttl=current_app.config.get('CATALOG_CACHE_TTL', 300)
+            )
+            if entry is None:
+                return rendered['response']
+            if not rendered:
+                _count('hits')
+
+            body, mimetype, etag = entry
+            response = Response(body, status=200, mimetype=mimetype)
+            response.set_etag(etag)
+            response.headers['Cache-Control'] = 'public, no-cache'
+            response.make_conditional(request)
+            if response.status_code == 304:
+                _count('not_modified')
+            return response
+        return decorated_function
+    return decorator
@@ -1,29 +1,23 @@
 from flask import Blueprint, request, jsonify
-from flask_jwt_extended import jwt_required, get_jwt_identity
-from models import db, Category, User
+from models import db, Category
+from views.cache import bump_version, cached_response
+from views.identity import admin_required
+from views.serializers import category_serializer
 
 category_bp = Blueprint('category_bp', __name__)
 
 # ✅ Public: View all categories
 @category_bp.route('/', methods=['GET'])
+@cached_response('catalog')
 def get_categories():
-    categories = Category.query.all()
-    return jsonify([{
-        'id': cat.id,
-        'name': cat.name
-    } for cat in categories]), 200
+    categories = db.session.query(*category_serializer.columns).all()
+    return jsonify(category_serializer.many(categories)), 200
 
 
 # ✅ Admin: Create a new category
 @category_bp.route('/', methods=['POST'])
-@jwt_required()
+@admin_required
 def create_category():
-    user_id = get_jwt_identity()
-    user = User.query.get(user_id)
-
-    if not user or not user.is_admin:
-        return jsonify({'error': 'Admins only'}), 403
-
     data = request.get_json()
     name = data.get('name')
 
@@ -36,20 +30,15 @@ def create_category():
     new_category = Category(name=name)
     db.session.add(new_category)
     db.session.commit()
+    bump_version('catalog')
 
     return jsonify({'message': 'Category added successfully'}), 201
 
 
 # ✅ Admin: Update a category
 @category_bp.route('/<int:category_id>', methods=['PATCH'])
-@jwt_required()
+@admin_required
 def update_category(category_id):
-    user_id = get_jwt_identity()
-    user = User.query.get(user_id)
-
-    if not user or not user.is_admin:
-        return jsonify({'error': 'Admins only'}), 403
-
     category = Category.query.get(category_id)
     if not category:
         return jsonify({'error': 'Category not found'}), 404
@@ -58,19 +47,14 @@ def update_category(category_id):
     category.name = data.get('name', category.name)
 
     db.session.commit()
+    bump_version('catalog')
     return jsonify({'message': 'Category updated successfully'}), 200
 
 
 # ✅ Admin: Delete a category
 @category_bp.route('/<int:category_id>', methods=['DELETE'])
-@jwt_required()
+@admin_required
 def delete_category(category_id):
-    user_id = get_jwt_identity()
-    user = User.query.get(user_id)
-
-    if not user or not user.is_admin:
-        return jsonify({'error': 'Admins only'}), 403
-
     category = Category.query.get(category_id)
     if not category:
         return jsonify({'error': 'Category not found'}), 404
@@ -80,4 +64,5 @@ def delete_category(category_id):
 
     db.session.delete(category)
     db.session.commit()
+    bump_version('catalog')
     return jsonify({'message': 'Category deleted successfully'}), 200
\ No newline at end of file
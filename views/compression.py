@@ -0,0 +1,100 @@
+from flask import request
+import zlib
+
+try:
+    import brotli
+except ImportError:  # optional: only gzip is offered when brotli is not installed
+    brotli = None
+
+# Text payloads worth compressing; images and already-encoded bodies are left alone
+COMPRESSIBLE_MIMETYPES = {'application/json', 'application/x-ndjson', 'text/csv', 'text/plain', 'text/html'}
+
+
+def negotiate_encoding(accept_encoding):
+    accepted = {part.split(';')[0].strip().lower() for part in accept_encoding.split(',')}
+    if brotli is not None and 'br' in accepted:
+        return 'br'
+    if 'gzip' in accepted:
+        return 'gzip'
+    return None
+
+
+def compress(data, encoding, level=6):
+    if encoding == 'br':
+        return brotli.compress(data, quality=min(level, 11))
+    # zlib.compress only takes wbits from Python 3.11; a compressobj writes the gzip wrapper on 3.8
+    compressor = zlib.compressobj(level, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+    return compressor.compress(data) + compressor.flush()
+
+
+def compress_stream(chunks, encoding, level=6):
+    """Compress an iterable of str/bytes chunks incrementally, one output block per input chunk.
+
+    Each chunk is flushed through the compressor, so a client sees every block
+    (an NDJSON line, a buffered 64 KiB export block) as soon as it is produced
+    rather than when the compressor's internal buffer happens to fill.
+    """
+    if encoding == 'br':
+        compressor = brotli.Compressor(quality=min(level, 11))
+        process, flush, finish = compressor.process, compressor.flush, compressor.finish
+    else:
+        compressor = zlib.compressobj(level, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+        process, finish = compressor.compress, compressor.flush
+        flush = lambda: compressor.flush(zlib.Z_SYNC_FLUSH)
+    for chunk in chunks:
+        data = process(chunk.encode('utf-8') if isinstance(chunk, str) else chunk) + flush()
+        if data:
+            yield data
+    yield finish()
+
+
+def compress_response(response, min_size=1024, level=6):
+    """Negotiate gzip/brotli for a finished response, after serialization.
+
+    Buffered bodies are compressed when at least `min_size` bytes; streamed
+    bodies are always compressed on the fly since their size is unknown.
+    """
+    if response.mimetype not in COMPRESSIBLE_MIMETYPES or response.direct_passthrough:
+        return response
+    response.vary.add('Accept-Encoding')
+    encoding = negotiate_encoding(request.headers.get('Accept-Encoding', ''))
+
+    if response.status_code == 304:
+        # Werkzeug keeps the body until it is sent, so we can tell whether the
+        # 200 being revalidated was compressed and repeat its weak ETag
+        if encoding is not None and (response.is_streamed or len(response.get_data()) >= min_size):
+            weaken_etag(response)
+        return response
+    if response.status_code < 200 or response.status_code == 204 \
+            or 'Content-Encoding' in response.headers or encoding is None:
+        return response
+
+    if response.is_streamed:
+        response.response = compress_stream(response.response, encoding, level)
+        response.headers.pop('Content-Length', None)
+    else:
+        data = response.get_data()
+        if len(data) < min_size:
+            return response
+        response.set_data(compress(data, encoding, level))
+
+    response.headers['Content-Encoding'] = encoding
+    weaken_etag(response)
+    return response
+
+
+def weaken_etag(response):
+    # The strong ETag names the uncompressed bytes; the encoded variant only matches weakly
+    etag, weak = response.get_etag()
+    if etag and not weak:
+        response.set_etag(etag, weak=True)
+
+
+def init_compression(app):
+    @app.after_request
+    def _compress(response):
+        return compress_response(
+            response,
+            min_size=app.config.get('COMPRESS_MIN_SIZE', 1024),
+            level=app.config.get('COMPRESS_LEVEL', 6)
+        )
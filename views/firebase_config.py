@@ -1,18 +1,38 @@
-import firebase_admin
-from firebase_admin import credentials, auth
+import hashlib
+import json
+import logging
 import os
-from dotenv import load_dotenv
+import re
+import threading
+import time
+import urllib.request
+from views.background import ProcessThread
+from views.cache import MemoryCache
+from views.instrumentation import record_firebase_verify
+from views.revocation import revoked_tokens
+
+logger = logging.getLogger(__name__)
+
+# firebase_admin is imported lazily: loading and initializing the SDK is the
+# slowest part of startup and only token verification needs it.
+_firebase_lock = threading.Lock()
+_firebase_ready = False
 
-load_dotenv()
 
 # Initialize Firebase Admin SDK
 def initialize_firebase():
+    import firebase_admin
+    from firebase_admin import credentials
+
     if not firebase_admin._apps:
+        private_key = os.getenv("FIREBASE_PRIVATE_KEY")
+        if not private_key:
+            raise RuntimeError("FIREBASE_PRIVATE_KEY is not set")
         cred = credentials.Certificate({
             "type": "service_account",
             "project_id": os.getenv("FIREBASE_PROJECT_ID"),
             "private_key_id": os.getenv("FIREBASE_PRIVATE_KEY_ID"),
-            "private_key": os.getenv("FIREBASE_PRIVATE_KEY").replace('\\n', '\n'),
+            "private_key": private_key.replace('\\n', '\n'),
             "client_email": os.getenv("FIREBASE_CLIENT_EMAIL"),
             "client_id": os.getenv("FIREBASE_CLIENT_ID"),
             "auth_uri": "https://accounts.google.com/o/oauth2/auth",
@@ -22,11 +42,192 @@ def initialize_firebase():
         })
         firebase_admin.initialize_app(cred)
 
+
+def ensure_firebase():
+    """Initialize the Firebase Admin SDK on first use, once per process."""
+    global _firebase_ready
+    if _firebase_ready:
+        return
+    with _firebase_lock:
+        if not _firebase_ready:
+            initialize_firebase()
+            _firebase_ready = True
+
+
+# Google's signing certificates for Firebase ID tokens, as {kid: PEM certificate}
+FIREBASE_CERTS_URL = 'https://www.googleapis.com/robot/v1/metadata/x509/securetoken@system.gserviceaccount.com'
+# Refresh this long before the published expiry; retry this soon after a failure
+KEY_REFRESH_MARGIN = 300
+KEY_RETRY_INTERVAL = 30
+
+
+class PublicKeyStore:
+    """Firebase signing keys held in memory and refreshed by a background thread.
+
+    Keys come from `certs_file` when set (same JSON shape as the Google
+    endpoint, re-read when it changes) or from `certs_url`, honouring its
+    Cache-Control max-age. Only the very first load happens on a request; after
+    that an unknown key id just wakes the refresher and the token is rejected.
+    """
+
+    def __init__(self, certs_url=FIREBASE_CERTS_URL, certs_file=None):
+        self.certs_url = certs_url
+        self.certs_file = certs_file
+        self._keys = {}
+        self._expires_at = 0.0
+        self._loaded_at = 0.0
+        self._file_mtime = None
+        self._lock = threading.Lock()
+        self._wake = threading.Event()
+        self._refresher = ProcessThread('firebase-key-refresh')
+
+    def get(self, kid):
+        self.ensure_refreshing()
+        key = self._keys.get(kid)
+        if key is None:
+            self._wake.set()
+        return key
+
+    def load(self):
+        from cryptography.x509 import load_pem_x509_certificate
+
+        if self.certs_file:
+            self._file_mtime = os.path.getmtime(self.certs_file)
+            with open(self.certs_file, 'rb') as f:
+                certs = json.load(f)
+            max_age = None
+        else:
+            with urllib.request.urlopen(self.certs_url, timeout=10) as response:
+                certs = json.load(response)
+                match = re.search(r'max-age=(\d+)', response.headers.get('Cache-Control', ''))
+            max_age = int(match.group(1)) if match else 3600
+
+        keys = {kid: load_pem_x509_certificate(pem.encode('utf-8')).public_key() for kid, pem in certs.items()}
+        self._keys = keys
+        self._loaded_at = time.time()
+        if max_age is not None:
+            self._expires_at = self._loaded_at + max_age
+
+    def ensure_refreshing(self):
+        self._refresher.ensure_started(self._start_refresher)
+
+    def _start_refresher(self):
+        if not self._keys:
+            self.load()
+        return self._refresh_loop
+
+    def _refresh_due(self):
+        if self.certs_file:
+            return os.path.getmtime(self.certs_file) != self._file_mtime
+        return time.time() >= self._expires_at - KEY_REFRESH_MARGIN
+
+    def _next_check(self):
+        if self.certs_file:
+            return KEY_RETRY_INTERVAL
+        return max(self._expires_at - time.time() - KEY_REFRESH_MARGIN, KEY_RETRY_INTERVAL)
+
+    def _refresh_loop(self):
+        while True:
+            woken = self._wake.wait(self._next_check())
+            self._wake.clear()
+            if woken:
+                # Unknown key ids trigger at most one extra load per retry interval
+                time.sleep(max(self._loaded_at + KEY_RETRY_INTERVAL - time.time(), 0))
+            try:
+                if woken or self._refresh_due():
+                    self.load()
+            except Exception as e:
+                # Keep serving the current keys until a refresh succeeds
+                logger.error(f"Firebase key refresh failed: {str(e)}")
+
+
+class LocalTokenVerifier:
+    """Checks Firebase ID tokens the way the Admin SDK does, without network calls."""
+
+    def __init__(self, project_id, key_store):
+        self.project_id = project_id
+        self.key_store = key_store
+
+    def verify(self, id_token):
+        import jwt
+
+        kid = jwt.get_unverified_header(id_token).get('kid')
+        key = self.key_store.get(kid)
+        if key is None:
+            raise ValueError(f"Unknown signing key: {kid}")
+        claims = jwt.decode(
+            id_token,
+            key,
+            algorithms=['RS256'],
+            audience=self.project_id,
+            issuer=f'https://securetoken.google.com/{self.project_id}',
+            options={'require': ['exp', 'iat', 'sub']}
+        )
+        subject = claims['sub']
+        if not isinstance(subject, str) or not subject or len(subject) > 128:
+            raise ValueError("Invalid token subject")
+        if claims.get('auth_time', 0) > time.time():
+            raise ValueError("Token auth_time is in the future")
+        claims['uid'] = subject
+        return claims
+
+
+# FIREBASE_VERIFIER=local (default) checks signatures in-process against keys
+# refreshed in the background; =sdk defers to firebase_admin.auth.
+FIREBASE_VERIFIER = os.getenv("FIREBASE_VERIFIER", "local")
+local_verifier = LocalTokenVerifier(
+    os.getenv("FIREBASE_PROJECT_ID"),
+    PublicKeyStore(
+        certs_url=os.getenv("FIREBASE_CERTS_URL", FIREBASE_CERTS_URL),
+        certs_file=os.getenv("FIREBASE_CERTS_FILE")
+    )
+)
+
+
+def warm_up_firebase():
+    """Load signing keys and start the refresher before the first request (e.g. after fork)."""
+    if FIREBASE_VERIFIER != "local":
+        return
+    try:
+        local_verifier.key_store.ensure_refreshing()
+    except Exception as e:
+        logger.error(f"Could not preload Firebase signing keys: {str(e)}")
+
+
+# Decoded claims keyed by token digest, each kept until the token's `exp`
+token_cache = MemoryCache(max_entries=int(os.getenv("TOKEN_CACHE_MAX_SIZE", 10000)))
+
+
+def token_digest(id_token):
+    # Raw tokens are bearer credentials, so only their digest is kept in memory
+    return hashlib.sha256(str(id_token).encode('utf-8')).hexdigest()
+
+
 # Verify Firebase ID token
 def verify_firebase_token(id_token):
-    try:
-        decoded_token = auth.verify_id_token(id_token)
+    key = token_digest(id_token)
+    # Logged-out tokens are blocklisted by digest (see views/revocation.py)
+    if revoked_tokens.is_revoked(key):
+        return None
+    decoded_token = token_cache.get(key)
+    if decoded_token is not None:
         return decoded_token
+
+    started = time.perf_counter()
+    try:
+        if FIREBASE_VERIFIER == "local":
+            decoded_token = local_verifier.verify(id_token)
+        else:
+            ensure_firebase()
+            from firebase_admin import auth
+            decoded_token = auth.verify_id_token(id_token)
     except Exception as e:
-        print(f"Token verification error: {str(e)}")
-        return None
\ No newline at end of file
+        logger.warning(f"Token verification error: {str(e)}")
+        return None
+    finally:
+        record_firebase_verify(time.perf_counter() - started)
+
+    ttl = decoded_token.get('exp', 0) - time.time()
+    if ttl > 0:
+        token_cache.set(key, decoded_token, ttl=ttl)
+    return decoded_token
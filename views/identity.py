@@ -0,0 +1,166 @@
+from flask import g, request, jsonify
+from sqlalchemy.exc import IntegrityError
+from models import db, User
+from views.firebase_config import verify_firebase_token
+from views.cache import MemoryCache, on_invalidation, publish_invalidation
+from collections import namedtuple
+from functools import wraps
+import logging
+import os
+
+logger = logging.getLogger(__name__)
+
+# Read-only view of a User row, safe to share between requests and threads
+UserSnapshot = namedtuple('UserSnapshot', ['id', 'firebase_uid', 'name', 'email', 'is_admin'])
+
+
+# firebase_uid -> UserSnapshot for this worker; the TTL is a safety net behind
+# the invalidation messages sent when a user changes
+identity_cache = MemoryCache(max_entries=int(os.getenv("IDENTITY_CACHE_MAX_SIZE", 10000)))
+IDENTITY_CACHE_TTL = int(os.getenv("IDENTITY_CACHE_TTL", 300))
+on_invalidation('identity', identity_cache.delete)
+
+
+def snapshot_user(user):
+    return UserSnapshot(
+        id=user.id,
+        firebase_uid=user.firebase_uid,
+        name=user.name,
+        email=user.email,
+        is_admin=bool(user.is_admin)
+    )
+
+
+def invalidate_user(firebase_uid):
+    """Drop a cached identity in every worker after the User row changed or was deleted."""
+    if firebase_uid:
+        publish_invalidation('identity', firebase_uid)
+
+
+def get_bearer_token():
+    auth_header = request.headers.get('Authorization')
+    if not auth_header or not auth_header.startswith('Bearer '):
+        return None
+    return auth_header.split(' ')[1]
+
+
+def resolve_user(decoded_token, create=False):
+    """Map verified token claims to a UserSnapshot, optionally creating the User on first login."""
+    firebase_uid = decoded_token.get('uid')
+    if not firebase_uid:
+        return None
+
+    snapshot = identity_cache.get(firebase_uid)
+    if snapshot is not None:
+        return snapshot
+
+    user = User.query.filter_by(firebase_uid=firebase_uid).first()
+    if not user and create:
+        email = decoded_token.get('email', '')
+        user = User(
+            firebase_uid=firebase_uid,
+            name=decoded_token.get('name', email.split('@')[0]),
+            email=email,
+            is_admin=False
+        )
+        db.session.add(user)
+        try:
+            db.session.commit()
+        except IntegrityError:
+            # A concurrent request registered the same account first
+            db.session.rollback()
+            user = User.query.filter_by(firebase_uid=firebase_uid).first()
+
+    if not user:
+        return None
+
+    snapshot = snapshot_user(user)
+    identity_cache.set(firebase_uid, snapshot, ttl=IDENTITY_CACHE_TTL)
+    return snapshot
+
+
+def get_token_claims():
+    """Verify the bearer token once per request and return its claims (None if absent or invalid)."""
+    if 'token_claims' not in g:
+        id_token = get_bearer_token()
+        g.token_claims = verify_firebase_token(id_token) if id_token else None
+    return g.token_claims
+
+
+def get_current_user(create=False):
+    """Resolve the caller's UserSnapshot once per request from the bearer token."""
+    if 'current_user' not in g:
+        decoded_token = get_token_claims()
+        g.current_user = resolve_user(decoded_token, create=create) if decoded_token else None
+    return g.current_user
+
+
+def firebase_auth_required(f):
+    """Custom decorator for Firebase authentication"""
+    @wraps(f)
+    def decorated_function(*args, **kwargs):
+        # Allow preflight requests to pass through
+        if request.method == 'OPTIONS':
+            return jsonify({'message': 'Preflight OK'}), 200
+
+        if not request.headers.get('Authorization'):
+            return jsonify({'error': 'No authorization header'}), 401
+
+        try:
+            user = get_current_user(create=True)
+            if not user:
+                return jsonify({'error': 'Invalid token'}), 401
+
+            request.current_user = user
+
+        except Exception as e:
+            logger.error(f"Authentication error: {str(e)}")
+            return jsonify({'error': 'Authentication failed'}), 401
+
+        return f(*args, **kwargs)
+    return decorated_function
+
+
+# Custom claim set with firebase_admin.auth.set_custom_user_claims(uid, {'admin': True})
+ADMIN_CLAIM = 'admin'
+
+
+def is_admin():
+    """True when the caller's token carries the admin claim or, failing that, their account is flagged admin."""
+    claims = get_token_claims()
+    if not claims:
+        return False
+    if claims.get(ADMIN_CLAIM) is True:
+        return True
+    user = get_current_user()
+    return bool(user and user.is_admin)
+
+
+def admin_required(f):
+    """Allow only admins, authorizing from the verified token where possible.
+
+    A token carrying the `admin` custom claim is accepted without touching the
+    database. Accounts without the claim fall back to the stored is_admin flag
+    (via the identity cache). Claims change when the client refreshes its
+    token, so revoking the claim takes effect within the token's hour.
+    """
+    @wraps(f)
+    def decorated_function(*args, **kwargs):
+        if request.method == 'OPTIONS':
+            return jsonify({'message': 'Preflight OK'}), 200
+
+        if not request.headers.get('Authorization'):
+            return jsonify({'error': 'No authorization header'}), 401
+
+        try:
+            claims = get_token_claims()
+            if not claims:
+                return jsonify({'error': 'Invalid token'}), 401
+            if not is_admin():
+                return jsonify({'error': 'Admins only'}), 403
+        except Exception as e:
+            logger.error(f"Authentication error: {str(e)}")
+            return jsonify({'error': 'Authentication failed'}), 401
+
+        return f(*args, **kwargs)
+    return decorated_function
@@ -0,0 +1,165 @@
+from flask import g, has_request_context, request
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+import bisect
+import logging
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+# Upper bounds in seconds; the implicit +Inf bucket catches the rest
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+QUERY_COUNT_BUCKETS = (1, 2, 5, 10, 20, 50, 100, 250)
+
+# Slow statements are logged with their text only; bound parameters (user
+# input, emails, prices) never reach the log
+SLOW_QUERY_MAX_LENGTH = 2000
+
+
+class Histogram:
+    """Cumulative per-label-set histogram, rendered in the Prometheus text format."""
+
+    def __init__(self, name, help_text, buckets, label_names=()):
+        self.name = name
+        self.help_text = help_text
+        self.buckets = tuple(buckets)
+        self.label_names = tuple(label_names)
+        self._series = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value, *labels):
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(labels)
+            if series is None:
+                series = self._series[labels] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+            series[0][index] += 1
+            series[1] += value
+            series[2] += 1
+
+    def render(self):
+        lines = [f'# HELP {self.name} {self.help_text}', f'# TYPE {self.name} histogram']
+        with self._lock:
+            series = [(labels, list(counts), total, count) for labels, (counts, total, count) in self._series.items()]
+        for labels, counts, total, count in sorted(series):
+            pairs = [f'{name}="{escape_label(value)}"' for name, value in zip(self.label_names, labels)]
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets + ('+Inf',), counts):
+                cumulative += bucket_count
+                le = ','.join(pairs + [f'le="{bound}"'])
+                lines.append(f'{self.name}_bucket{{{le}}} {cumulative}')
+            suffix = '{' + ','.join(pairs) + '}' if pairs else ''
+            lines.append(f'{self.name}_sum{suffix} {total}')
+            lines.append(f'{self.name}_count{suffix} {count}')
+        return lines
+
+
+def escape_label(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+request_latency = Histogram(
+    'http_request_duration_seconds', 'Time spent handling a request, by route.',
+    LATENCY_BUCKETS, ('method', 'route', 'status')
+)
+request_db_time = Histogram(
+    'http_request_db_seconds', 'Total SQL execution time per request, by route.',
+    LATENCY_BUCKETS, ('method', 'route')
+)
+request_queries = Histogram(
+    'http_request_queries', 'SQL statements executed per request, by route.',
+    QUERY_COUNT_BUCKETS, ('method', 'route')
+)
+firebase_verify_time = Histogram(
+    'firebase_verify_duration_seconds', 'Time spent verifying Firebase ID tokens (cache misses only).',
+    LATENCY_BUCKETS
+)
+
+HISTOGRAMS = (request_latency, request_db_time, request_queries, firebase_verify_time)
+
+_slow_query_seconds = 0.5
+
+
+def redact_statement(statement):
+    statement = ' '.join(statement.split())
+    if len(statement) > SLOW_QUERY_MAX_LENGTH:
+        statement = statement[:SLOW_QUERY_MAX_LENGTH] + '...'
+    return statement
+
+
+@event.listens_for(Engine, 'before_cursor_execute')
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault('query_started', []).append(time.perf_counter())
+
+
+@event.listens_for(Engine, 'after_cursor_execute')
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    started = conn.info.get('query_started')
+    if not started:
+        return
+    elapsed = time.perf_counter() - started.pop()
+
+    if has_request_context():
+        g.db_queries = g.get('db_queries', 0) + 1
+        g.db_seconds = g.get('db_seconds', 0.0) + elapsed
+
+    if elapsed >= _slow_query_seconds:
+        route = request.endpoint if has_request_context() else None
+        logger.warning(
+            f"Slow query ({elapsed * 1000:.1f} ms, route={route}, executemany={executemany}): "
+            f"{redact_statement(statement)} [parameters redacted]"
+        )
+
+
+def record_firebase_verify(seconds):
+    firebase_verify_time.observe(seconds)
+    if has_request_context():
+        g.firebase_seconds = g.get('firebase_seconds', 0.0) + seconds
+
+
+def _route_label():
+    # The URL rule, not the raw path, so /vehicles/1 and /vehicles/2 share a series
+    rule = request.url_rule
+    return rule.rule if rule is not None else 'unmatched'
+
+
+def _record_request(status):
+    started = g.pop('request_started', None)
+    if started is None:
+        return
+    route = _route_label()
+    request_latency.observe(time.perf_counter() - started, request.method, route, str(status))
+    request_db_time.observe(g.get('db_seconds', 0.0), request.method, route)
+    request_queries.observe(g.get('db_queries', 0), request.method, route)
+
+
+def render_metrics():
+    lines = []
+    for histogram in HISTOGRAMS:
+        lines.extend(histogram.render())
+    return lines
+
+
+def init_instrumentation(app):
+    """Time every request and its SQL. Metrics are per worker process.
+
+    Streamed responses are timed up to the point the body starts streaming.
+    """
+    global _slow_query_seconds
+    _slow_query_seconds = app.config.get('SLOW_QUERY_MS', 500) / 1000
+
+    @app.before_request
+    def start_request_timer():
+        g.request_started = time.perf_counter()
+
+    @app.after_request
+    def record_request(response):
+        _record_request(response.status_code)
+        return response
+
+    @app.teardown_request
+    def record_failed_request(error):
+        # Only still pending when the view raised and after_request never ran
+        if error is not None:
+            _record_request(500)
@@ -0,0 +1,73 @@
+from flask import Blueprint, Response, abort, current_app, jsonify, request
+from db_pool import pool_stats
+from models import db
+from views.cache import cache_stats
+from views.identity import get_bearer_token
+from views.instrumentation import render_metrics
+import hmac
+import ipaddress
+
+monitoring_bp = Blueprint('monitoring_bp', __name__)
+
+
+def metrics_allowed():
+    """True when the caller presents METRICS_TOKEN or connects from METRICS_ALLOWED_IPS."""
+    expected = current_app.config.get('METRICS_TOKEN')
+    token = get_bearer_token()
+    if expected and token and hmac.compare_digest(token.encode(), expected.encode()):
+        return True
+
+    allowed = [part.strip() for part in current_app.config.get('METRICS_ALLOWED_IPS', '').split(',') if part.strip()]
+    if not allowed or not request.remote_addr:
+        return False
+    try:
+        address = ipaddress.ip_address(request.remote_addr)
+    except ValueError:
+        return False
+    return any(address in ipaddress.ip_network(network, strict=False) for network in allowed)
+
+
+# Metrics expose query volume, pool state and cache behaviour, so they are not public;
+# 404 rather than 403 so the endpoint's existence is not advertised either
+@monitoring_bp.before_request
+def restrict_metrics():
+    if not metrics_allowed():
+        abort(404)
+
+
+# Ops: connection pool usage for the current worker process
+@monitoring_bp.route('/pool', methods=['GET'])
+def get_pool_metrics():
+    return jsonify(pool_stats(db.engine.pool)), 200
+
+
+# Ops: response cache hit rate for the current worker process
+@monitoring_bp.route('/cache', methods=['GET'])
+def get_cache_metrics():
+    return jsonify(cache_stats()), 200
+
+
+def gauge_lines(name, help_text, value, metric_type='gauge'):
+    return [f'# HELP {name} {help_text}', f'# TYPE {name} {metric_type}', f'{name} {value}']
+
+
+# Ops: Prometheus scrape target for the current worker process
+@monitoring_bp.route('', methods=['GET'])
+def get_prometheus_metrics():
+    lines = render_metrics()
+
+    pool = pool_stats(db.engine.pool)
+    if 'checked_out' in pool:
+        lines += gauge_lines('db_pool_checked_out', 'Connections currently checked out.', pool['checked_out'])
+        lines += gauge_lines('db_pool_overflow', 'Connections open beyond the pool size.', pool['overflow'])
+    if 'wait' in pool:
+        wait = pool['wait']
+        lines += gauge_lines('db_pool_wait_seconds_total', 'Time spent waiting for a connection.',
+                             wait['wait_seconds_total'], 'counter')
+        lines += gauge_lines('db_pool_timeouts_total', 'Connection checkouts that timed out.', wait['timeouts'], 'counter')
+
+    cache = cache_stats()
+    lines += gauge_lines('response_cache_hits_total', 'Cached responses served.', cache['hits'], 'counter')
+    lines += gauge_lines('response_cache_misses_total', 'Responses rendered on a cache miss.', cache['misses'], 'counter')
+
+    return Response('\n'.join(lines) + '\n', mimetype='text/plain; version=0.0.4'), 200
@@ -0,0 +1,55 @@
+import base64
+import json
+from flask import request
+
+DEFAULT_PAGE_SIZE = 50
+MAX_PAGE_SIZE = 200
+
+
+def encode_cursor(values):
+    """Opaque cursor for the sort key of the last row on a page."""
+    raw = json.dumps(list(values), separators=(',', ':'), default=str)
+    return base64.urlsafe_b64encode(raw.encode('utf-8')).decode('ascii').rstrip('=')
+
+
+def decode_cursor(cursor, size):
+    """Inverse of encode_cursor; raises ValueError for anything malformed."""
+    try:
+        padded = cursor + '=' * (-len(cursor) % 4)
+        values = json.loads(base64.urlsafe_b64decode(padded.encode('ascii')))
+    except Exception:
+        raise ValueError('Invalid cursor')
+    if not isinstance(values, list) or len(values) != size:
+        raise ValueError('Invalid cursor')
+    return values
+
+
+def wants_page():
+    """Pagination is opt-in so existing clients keep receiving plain lists."""
+    return 'limit' in request.args or 'cursor' in request.args
+
+
+def parse_limit():
+    raw = request.args.get('limit')
+    if raw is None:
+        return DEFAULT_PAGE_SIZE
+    # Validated by hand: args.get(type=int) falls back to the default on bad input
+    try:
+        limit = int(raw)
+    except ValueError:
+        raise ValueError('limit must be a positive integer')
+    if limit < 1:
+        raise ValueError('limit must be a positive integer')
+    return min(limit, MAX_PAGE_SIZE)
+
+
+def parse_fields(allowed, default):
+    """Validate a comma-separated `fields=` projection against the allowed names."""
+    fields = request.args.get('fields')
+    if not fields:
+        return list(default)
+    requested = list(dict.fromkeys(f.strip() for f in fields.split(',') if f.strip()))
+    unknown = [f for f in requested if f not in allowed]
+    if unknown:
+        raise ValueError(f'Unknown fields: {", ".join(unknown)}')
+    return requested
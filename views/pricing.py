@@ -0,0 +1,110 @@
+from datetime import date
+from flask import current_app
+from models import db, Vehicle
+from views.cache import get_or_compute
+
+# Flat daily fee when the customer asks for a driver (same rule as Booking.calculate_total)
+DRIVER_FEE_PER_DAY = 1000
+
+
+def rental_days(start_date, end_date):
+    # Both the pickup and the return day are charged
+    return (end_date - start_date).days + 1
+
+
+class SeasonalRate:
+    """Multiply the daily rate by `multiplier` on days between two (month, day) bounds, inclusive.
+
+    A season whose start is later in the year than its end wraps over New Year.
+    """
+
+    def __init__(self, label, start, end, multiplier):
+        self.label = label
+        self.start = start
+        self.end = end
+        self.multiplier = multiplier
+
+    def _in_season(self, day):
+        key = (day.month, day.day)
+        if self.start <= self.end:
+            return self.start <= key <= self.end
+        return key >= self.start or key <= self.end
+
+    def adjust(self, start_date, end_date, days, rate_days):
+        in_season = sum(
+            1 for offset in range(days)
+            if self._in_season(date.fromordinal(start_date.toordinal() + offset))
+        )
+        return in_season * (self.multiplier - 1)
+
+
+class LongRentalDiscount:
+    """Take `percent` off rentals of at least `min_days` days."""
+
+    def __init__(self, label, min_days, percent):
+        self.label = label
+        self.min_days = min_days
+        self.percent = percent
+
+    def adjust(self, start_date, end_date, days, rate_days):
+        if days < self.min_days:
+            return 0
+        return -rate_days * self.percent / 100
+
+
+def pricing_rules():
+    """Rules applied in order; configure with app.config['PRICING_RULES']."""
+    return current_app.config.get('PRICING_RULES') or []
+
+
+def price_factors(start_date, end_date, rules):
+    """Express a date range as "rate-days": the multiple of a vehicle's daily price it costs.
+
+    Every rule is linear in the daily rate, so this is computed once per date
+    range and shared by every vehicle quoted for it.
+    """
+    days = rental_days(start_date, end_date)
+    rate_days = days
+    adjustments = []
+    for rule in rules:
+        delta = rule.adjust(start_date, end_date, days, rate_days)
+        if delta:
+            adjustments.append((rule.label, delta))
+            rate_days += delta
+    return days, rate_days, adjustments
+
+
+def build_quote(vehicle_id, price, factors, need_driver):
+    days, rate_days, adjustments = factors
+    driver_fee = DRIVER_FEE_PER_DAY * days if need_driver else 0.0
+    rental_price = round(price * rate_days, 2)
+    return {
+        'vehicle_id': vehicle_id,
+        'days': days,
+        'daily_rate': price,
+        'base_price': round(price * days, 2),
+        'adjustments': [{'rule': label, 'amount': round(price * delta, 2)} for label, delta in adjustments],
+        'rental_price': rental_price,
+        'driver_fee': float(driver_fee),
+        'total_price': round(rental_price + driver_fee, 2)
+    }
+
+
+def quote_vehicle(vehicle, start_date, end_date, need_driver=False):
+    """Server-side price for one vehicle, cached per (vehicle, price, dates, options)."""
+    # The daily price is part of the key, so a price change never serves an old quote
+    key = (f'quote:{vehicle.id}:{vehicle.price}:{start_date.isoformat()}:'
+           f'{end_date.isoformat()}:{int(bool(need_driver))}')
+
+    def compute():
+        factors = price_factors(start_date, end_date, pricing_rules())
+        return build_quote(vehicle.id, vehicle.price, factors, need_driver)
+
+    return get_or_compute(key, compute, ttl=current_app.config.get('CATALOG_CACHE_TTL', 300))
+
+
+def quote_vehicles(vehicle_ids, start_date, end_date, need_driver=False):
+    """Quote many vehicles for one date range: one price query, one pass over the rules."""
+    factors = price_factors(start_date, end_date, pricing_rules())
+    rows = db.session.query(Vehicle.id, Vehicle.price).filter(Vehicle.id.in_(vehicle_ids)).all()
+    return {vehicle_id: build_quote(vehicle_id, price, factors, need_driver) for vehicle_id, price in rows}
@@ -0,0 +1,126 @@
+from flask import current_app, has_app_context
+from datetime import datetime, timedelta
+from models import db, TokenBlocklist
+from views.background import ProcessThread
+from views.cache import on_invalidation, publish_invalidation
+import click
+import logging
+import os
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+# Firebase ID tokens live at most an hour, so a blocklist row older than this
+# only blocks a token that would be rejected as expired anyway
+REVOKED_TOKEN_TTL = 3600
+# Each refresh re-reads this far behind the watermark, so a row whose
+# transaction committed after a newer row was already seen is still picked up
+WATERMARK_OVERLAP = timedelta(seconds=30)
+
+
+class RevokedTokens:
+    """In-memory front for the token_blocklist table.
+
+    Lookups are a dict hit. New rows are pulled in by `created_at` watermark
+    at most every `refresh_interval` seconds; revocations made in this
+    deployment also arrive straight away as invalidation messages.
+    """
+
+    def __init__(self, refresh_interval=5):
+        self.refresh_interval = refresh_interval
+        self._revoked = {}  # jti -> revoked_at
+        self._watermark = None
+        self._next_refresh = 0.0
+        self._lock = threading.Lock()
+
+    def add(self, jti, revoked_at=None):
+        self._revoked[jti] = revoked_at or datetime.utcnow()
+
+    def is_revoked(self, jti):
+        self.refresh()
+        revoked_at = self._revoked.get(jti)
+        return revoked_at is not None and revoked_at > expiry_cutoff()
+
+    def refresh(self):
+        if time.monotonic() < self._next_refresh or not has_app_context():
+            return
+        if not self._lock.acquire(blocking=False):
+            return  # another thread is already refreshing
+        try:
+            cutoff = expiry_cutoff()
+            since = max(self._watermark - WATERMARK_OVERLAP, cutoff) if self._watermark else cutoff
+            rows = db.session.query(TokenBlocklist.jti, TokenBlocklist.created_at) \
+                .filter(TokenBlocklist.created_at >= since).all()
+            for jti, created_at in rows:
+                self._revoked[jti] = created_at
+                self._watermark = max(self._watermark or created_at, created_at)
+            for jti in [jti for jti, at in list(self._revoked.items()) if at <= cutoff]:
+                self._revoked.pop(jti, None)
+            self._next_refresh = time.monotonic() + self.refresh_interval
+        finally:
+            self._lock.release()
+
+    def clear(self):
+        self._revoked.clear()
+        self._watermark = None
+        self._next_refresh = 0.0
+
+
+revoked_tokens = RevokedTokens(refresh_interval=int(os.getenv("REVOCATION_REFRESH_SECONDS", 5)))
+on_invalidation('revoked', revoked_tokens.add)
+
+
+def expiry_cutoff():
+    return datetime.utcnow() - timedelta(seconds=REVOKED_TOKEN_TTL)
+
+
+def revoke_token(jti):
+    """Blocklist a token digest in the database and in every worker."""
+    db.session.add(TokenBlocklist(jti=jti, created_at=datetime.utcnow()))
+    db.session.commit()
+    publish_invalidation('revoked', jti)
+
+
+def purge_expired_tokens():
+    deleted = TokenBlocklist.query.filter(TokenBlocklist.created_at <= expiry_cutoff()).delete()
+    db.session.commit()
+    return deleted
+
+
+REVOCATION_PURGE_INTERVAL = int(os.getenv("REVOCATION_PURGE_INTERVAL", 3600))
+_purger = ProcessThread('blocklist-purge')
+
+
+def _purge_loop(app):
+    while True:
+        time.sleep(REVOCATION_PURGE_INTERVAL)
+        try:
+            with app.app_context():
+                deleted = purge_expired_tokens()
+            if deleted:
+                logger.info(f"Purged {deleted} expired blocklist entries")
+        except Exception as e:
+            logger.error(f"Blocklist purge failed: {str(e)}")
+
+
+def ensure_purging():
+    """Start this worker's purge thread."""
+    if REVOCATION_PURGE_INTERVAL:
+        _purger.ensure_started(_start_purging)
+
+
+def _start_purging():
+    app = current_app._get_current_object()
+    return lambda: _purge_loop(app)
+
+
+def init_revocation(app):
+    @app.before_request
+    def start_blocklist_purge():
+        ensure_purging()
+
+    @app.cli.command('purge-revoked-tokens')
+    def purge_revoked_tokens_command():
+        """Delete blocklist entries whose tokens have expired anyway."""
+        click.echo(f"Deleted {purge_expired_tokens()} expired blocklist entries.")
@@ -0,0 +1,175 @@
+from flask.json.provider import DefaultJSONProvider
+from functools import lru_cache
+from models import Booking, Category, User, Vehicle
+import json
+
+try:
+    import orjson
+except ImportError:  # optional: stdlib json is used when orjson is not installed
+    orjson = None
+
+
+def iso(value):
+    return value.isoformat() if value is not None else None
+
+
+def float_or_zero(value):
+    return float(value) if value else 0
+
+
+def none_if_empty(value):
+    return value or None
+
+
+class RowSerializer:
+    """Declarative row -> dict mapping, compiled once into a plain function.
+
+    `fields` is a list of (key, column) or (key, column, converter) tuples, or
+    (key, RowSerializer) for a nested object. `columns` lists the columns to
+    select, in order; the compiled function reads rows by position, so extra
+    columns appended after them (e.g. keyset sort keys) are ignored.
+    """
+
+    def __init__(self, fields):
+        self.fields = fields
+        self.columns = []
+        namespace = {}
+        body = self._compile(fields, namespace)
+        source = f'def serialize(row):\n    return {body}\n'
+        exec(compile(source, '<serializer>', 'exec'), namespace)
+        self.serialize = namespace['serialize']
+
+    def _compile(self, fields, namespace):
+        items = []
+        for key, target, *convert in fields:
+            if isinstance(target, RowSerializer):
+                items.append(f'{key!r}: {self._compile(target.fields, namespace)}')
+                continue
+            expr = f'row[{len(self.columns)}]'
+            # Positional labels keep same-named columns (vehicle.name, category.name) distinct
+            self.columns.append(target.label(f'_c{len(self.columns)}'))
+            if convert:
+                name = f'_convert_{len(namespace)}'
+                namespace[name] = convert[0]
+                expr = f'{name}({expr})'
+            items.append(f'{key!r}: {expr}')
+        return '{' + ', '.join(items) + '}'
+
+    def __call__(self, row):
+        return self.serialize(row)
+
+    def many(self, rows):
+        serialize = self.serialize
+        return [serialize(row) for row in rows]
+
+
+category_serializer = RowSerializer([
+    ('id', Category.id),
+    ('name', Category.name)
+])
+
+user_serializer = RowSerializer([
+    ('id', User.id),
+    ('name', User.name),
+    ('email', User.email),
+    ('is_admin', User.is_admin)
+])
+
+# Columns the vehicle list can project with `fields=`
+VEHICLE_FIELDS = {
+    'id': (Vehicle.id,),
+    'name': (Vehicle.name,),
+    'description': (Vehicle.description,),
+    'price': (Vehicle.price,),
+    'availability': (Vehicle.availability,),
+    'category': (Category.name,),
+    'image_url': (Vehicle.image_url, none_if_empty)
+}
+
+
+@lru_cache(maxsize=128)
+def vehicle_serializer(fields=tuple(VEHICLE_FIELDS)):
+    return RowSerializer([(f, *VEHICLE_FIELDS[f]) for f in fields])
+
+
+my_booking_serializer = RowSerializer([
+    ('id', Booking.id),
+    ('vehicle', Vehicle.name),
+    ('start_date', Booking.start_date, iso),
+    ('end_date', Booking.end_date, iso),
+    ('status', Booking.booking_status),
+    ('full_name', Booking.full_name),
+    ('phone', Booking.phone),
+    ('pickup_option', Booking.pickup_option),
+    ('need_driver', Booking.need_driver),
+    ('payment_method', Booking.payment_method),
+    ('total_price', Booking.total_price)
+])
+
+admin_booking_serializer = RowSerializer([
+    ('id', Booking.id),
+    ('user', User.name),
+    ('vehicle', Vehicle.name),
+    ('start_date', Booking.start_date, iso),
+    ('end_date', Booking.end_date, iso),
+    ('status', Booking.booking_status),
+    ('full_name', Booking.full_name),
+    ('phone', Booking.phone),
+    ('email', Booking.email),
+    ('pickup_option', Booking.pickup_option),
+    ('need_driver', Booking.need_driver),
+    ('payment_method', Booking.payment_method),
+    ('total_price', Booking.total_price)
+])
+
+booking_detail_serializer = RowSerializer([
+    ('id', Booking.id),
+    ('user_id', Booking.user_id),
+    ('vehicle_id', Booking.vehicle_id),
+    ('start_date', Booking.start_date, iso),
+    ('end_date', Booking.end_date, iso),
+    ('full_name', Booking.full_name),
+    ('phone', Booking.phone),
+    ('email', Booking.email),
+    ('id_number', Booking.id_number),
+    ('driving_license', Booking.driving_license),
+    ('pickup_option', Booking.pickup_option),
+    ('delivery_address', Booking.delivery_address),
+    ('need_driver', Booking.need_driver),
+    ('special_requests', Booking.special_requests),
+    ('payment_method', Booking.payment_method),
+    ('total_price', Booking.total_price, float),
+    ('driver_fee', Booking.driver_fee, float_or_zero),
+    ('booking_status', Booking.booking_status),
+    ('created_at', Booking.created_at, iso),
+    ('vehicle', RowSerializer([
+        ('id', Vehicle.id),
+        ('name', Vehicle.name),
+        ('description', Vehicle.description),
+        ('price', Vehicle.price, float),
+        ('image_url', Vehicle.image_url),
+        ('availability', Vehicle.availability)
+    ]))
+])
+
+
+def dumps(obj):
+    """Compact JSON text, through orjson when it is installed."""
+    if orjson is not None:
+        return orjson.dumps(obj, default=str).decode('utf-8')
+    return json.dumps(obj, separators=(',', ':'), default=str)
+
+
+class OrjsonProvider(DefaultJSONProvider):
+    """Flask JSON provider backed by orjson, falling back to the default encoder hooks."""
+
+    def dumps(self, obj, **kwargs):
+        return orjson.dumps(obj, default=DefaultJSONProvider.default, option=orjson.OPT_NON_STR_KEYS).decode('utf-8')
+
+    def loads(self, s, **kwargs):
+        return orjson.loads(s)
+
+
+def init_json(app):
+    if orjson is not None:
+        app.json = OrjsonProvider(app)
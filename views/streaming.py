@@ -0,0 +1,88 @@
+import csv
+from flask import Response, stream_with_context
+from views.serializers import dumps
+
+# Rows fetched per round-trip when streaming from a server-side cursor
+STREAM_BATCH_SIZE = 1000
+
+# Bytes gathered before each write, so the compressor and the socket see large blocks
+STREAM_CHUNK_SIZE = 64 * 1024
+
+
+def ndjson_lines(rows, serialize):
+    for row in rows:
+        yield dumps(serialize(row)) + '\n'
+
+
+def ndjson_response(rows, serialize, headers=None):
+    """Stream rows as newline-delimited JSON while they are still being fetched."""
+    return Response(
+        stream_with_context(ndjson_lines(rows, serialize)),
+        mimetype='application/x-ndjson',
+        headers=headers
+    )
+
+
+class _LineBuffer:
+    """File-like sink that hands back whatever csv.writer writes to it."""
+
+    def write(self, value):
+        return value
+
+
+# Spreadsheets evaluate a cell starting with one of these as a formula (CSV injection)
+FORMULA_PREFIXES = ('=', '+', '-', '@', '\t', '\r')
+
+
+def csv_cell(value):
+    """Neutralise user-controlled text that a spreadsheet would run as a formula."""
+    if isinstance(value, str) and value.startswith(FORMULA_PREFIXES):
+        return "'" + value
+    return value
+
+
+def csv_lines(header, rows):
+    writer = csv.writer(_LineBuffer())
+    yield writer.writerow(header)
+    for row in rows:
+        yield writer.writerow([csv_cell(value) for value in row])
+
+
+def buffered(chunks, size=STREAM_CHUNK_SIZE):
+    """Coalesce many small text chunks into blocks of roughly `size` bytes."""
+    pending = []
+    pending_size = 0
+    for chunk in chunks:
+        data = chunk.encode('utf-8')
+        pending.append(data)
+        pending_size += len(data)
+        if pending_size >= size:
+            yield b''.join(pending)
+            pending = []
+            pending_size = 0
+    if pending:
+        yield b''.join(pending)
+
+
+def json_array_lines(rows, serialize):
+    """Write a JSON array one element at a time instead of building the whole list."""
+    yield '['
+    first = True
+    for row in rows:
+        if first:
+            first = False
+            yield dumps(serialize(row))
+        else:
+            yield ',' + dumps(serialize(row))
+    yield ']'
+
+
+def json_array_response(rows, serialize):
+    """Stream a JSON array so serialization, compression and transfer overlap with fetching."""
+    return Response(stream_with_context(buffered(json_array_lines(rows, serialize))), mimetype='application/json')
+
+
+def export_response(chunks, mimetype, filename):
+    """Stream a download; compression is negotiated by the app-wide after_request hook."""
+    headers = {'Content-Disposition': f'attachment; filename="{filename}"'}
+    return Response(stream_with_context(buffered(chunks)), mimetype=mimetype, headers=headers)
@@ -1,26 +1,16 @@
 from flask import Blueprint, jsonify, request
 from models import db, User
-from views.firebase_config import verify_firebase_token  
+from views.cache import bump_version
+from views.identity import admin_required, get_current_user, invalidate_user
+from views.serializers import user_serializer
+from views.streaming import STREAM_BATCH_SIZE, json_array_response
 
 
 user_bp = Blueprint('user_bp', __name__)
 
-def get_current_user(request):
-    auth_header = request.headers.get('Authorization')
-    if not auth_header or not auth_header.startswith('Bearer '):
-        return None
-    
-    id_token = auth_header.split(' ')[1]
-    decoded_token = verify_firebase_token(id_token)
-    if not decoded_token:
-        return None
-    
-    firebase_uid = decoded_token.get('uid')
-    return User.query.filter_by(firebase_uid=firebase_uid).first()
-
 @user_bp.route('/me', methods=['GET'])
 def get_my_profile():
-    user = get_current_user(request)
+    user = get_current_user()
     if not user:
         return jsonify({'error': 'User not found or unauthorized'}), 404
     
@@ -33,7 +23,8 @@ def get_my_profile():
 
 @user_bp.route('/me', methods=['PATCH'])
 def update_my_profile():
-    user = get_current_user(request)
+    current_user = get_current_user()
+    user = db.session.get(User, current_user.id) if current_user else None
     if not user:
         return jsonify({'error': 'User not found or unauthorized'}), 404
     
@@ -42,34 +33,25 @@ def update_my_profile():
     user.email = data.get('email', user.email)
     
     db.session.commit()
+    invalidate_user(user.firebase_uid)
     return jsonify({'message': 'Profile updated successfully'}), 200
 
 @user_bp.route('/', methods=['GET'])
+@admin_required
 def get_all_users():
-    user = get_current_user(request)
-    if not user or not user.is_admin:
-        return jsonify({'error': 'Unauthorized'}), 403
-    
-    users = User.query.all()
-    return jsonify([
-        {
-            'id': u.id,
-            'name': u.name,
-            'email': u.email,
-            'is_admin': u.is_admin
-        } for u in users
-    ]), 200
+    users = db.session.query(*user_serializer.columns).yield_per(STREAM_BATCH_SIZE)
+    return json_array_response(users, user_serializer)
 
 @user_bp.route('/<int:user_id>', methods=['DELETE'])
+@admin_required
 def delete_user(user_id):
-    current_user = get_current_user(request)
-    if not current_user or not current_user.is_admin:
-        return jsonify({'error': 'Unauthorized'}), 403
-    
-    user = User.query.get(user_id)
+    user = db.session.get(User, user_id)
     if not user:
         return jsonify({'error': 'User not found'}), 404
     
+    firebase_uid = user.firebase_uid
     db.session.delete(user)
     db.session.commit()
+    invalidate_user(firebase_uid)
+    bump_version('bookings')  # the user's bookings were deleted with them
     return jsonify({'message': 'User deleted successfully'}), 200
\ No newline at end of file
@@ -1,28 +1,92 @@
 from flask import Blueprint, request, jsonify
-from flask_jwt_extended import jwt_required, get_jwt_identity
-from models import db, Vehicle, Category, User
+from models import db, Vehicle, Category
+from sqlalchemy import func, tuple_
+from sqlalchemy.dialects.postgresql import insert as postgresql_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.exc import SQLAlchemyError
+from views.availability import vehicle_is_free_clause
+from views.cache import bump_version, cached_response
+from views.identity import admin_required
+from views.serializers import VEHICLE_FIELDS, vehicle_serializer
+from views.pagination import decode_cursor, encode_cursor, parse_fields, parse_limit, wants_page
+from datetime import datetime
+import json
+import logging
 
 vehicle_bp = Blueprint('vehicle_bp', __name__)
+logger = logging.getLogger(__name__)
+
+# Keyset sort orders: `sort=` value -> columns making up the cursor
+VEHICLE_SORT_KEYS = {
+    'id': (Vehicle.id,),
+    'price': (Vehicle.price, Vehicle.id)
+}
+
+
+def vehicle_list_namespaces():
+    # Only date-range searches depend on bookings; plain catalog pages survive new bookings
+    if request.args.get('start_date') or request.args.get('end_date'):
+        return ('bookings',)
+    return ()
+
 
 # ✅ Public: View all available vehicles with filtering
 @vehicle_bp.route('/', methods=['GET'])
+@cached_response('catalog', vehicle_list_namespaces)
 def get_vehicles():
     category_name = request.args.get('category')  # e.g., 'SUV'
     min_price = request.args.get('min_price', type=float)
     max_price = request.args.get('max_price', type=float)
     available = request.args.get('available')  # 'true' or 'false'
+    start_date = request.args.get('start_date')  # e.g., '2025-08-01'
+    end_date = request.args.get('end_date')
+    sort = request.args.get('sort', 'id')  # 'id' or 'price'
+
+    if sort not in VEHICLE_SORT_KEYS:
+        return jsonify({'error': 'sort must be one of: id, price'}), 400
+    sort_keys = VEHICLE_SORT_KEYS[sort]
+
+    try:
+        fields = parse_fields(VEHICLE_FIELDS, VEHICLE_FIELDS)
+        paginate = wants_page()
+        limit = parse_limit() if paginate else None
+        cursor = request.args.get('cursor')
+        after = decode_cursor(cursor, len(sort_keys)) if cursor else None
+        if after and not all(isinstance(v, (int, float)) for v in after):
+            raise ValueError('Invalid cursor')
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+
+    # Load only the projected columns plus the sort key, never whole rows
+    serializer = vehicle_serializer(tuple(fields))
+    columns = serializer.columns + [key.label(f'_sort_{i}') for i, key in enumerate(sort_keys)]
+    query = db.session.query(*columns).select_from(Vehicle).outerjoin(Category)
 
-    query = Vehicle.query
+    # Filter by free dates: no overlapping non-cancelled booking
+    if start_date or end_date:
+        if not (start_date and end_date):
+            return jsonify({'error': 'start_date and end_date must be provided together'}), 400
+        try:
+            start = datetime.strptime(start_date, '%Y-%m-%d').date()
+            end = datetime.strptime(end_date, '%Y-%m-%d').date()
+        except ValueError:
+            return jsonify({'error': 'Invalid date format. Use YYYY-MM-DD'}), 400
+        if start > end:
+            return jsonify({'error': 'end_date cannot be before start_date'}), 400
+        query = query.filter(vehicle_is_free_clause(start, end))
 
     # Filter by availability
     if available == 'true':
-        query = query.filter_by(availability=True)
+        query = query.filter(Vehicle.availability.is_(True))
     elif available == 'false':
-        query = query.filter_by(availability=False)
+        query = query.filter(Vehicle.availability.is_(False))
 
-    # Filter by category name (case-insensitive)
+    # Filter by category name (case-insensitive, matches ix_category_name_lower). As a
+    # category_id subquery rather than a predicate on the outer-joined row, so the
+    # vehicle side can seek ix_vehicle_category_availability_price instead of scanning
     if category_name:
-        query = query.join(Category).filter(Category.name.ilike(category_name))
+        category_ids = db.session.query(Category.id).filter(func.lower(Category.name) == category_name.lower())
+        query = query.filter(Vehicle.category_id.in_(category_ids.scalar_subquery()))
 
     # Filter by price range
     if min_price is not None:
@@ -30,46 +94,44 @@ def get_vehicles():
     if max_price is not None:
         query = query.filter(Vehicle.price <= max_price)
 
-    vehicles = query.all()
-    return jsonify([{
-        'id': v.id,
-        'name': v.name,
-        'description': v.description,
-        'price': v.price,
-        'availability': v.availability,
-        'category': v.category.name if v.category else None,
-        'image_url': v.image_url if v.image_url else None  # Ensure image_url is returned
-    } for v in vehicles]), 200
+    # Keyset pagination: resume strictly after the previous page's last sort key
+    if after is not None:
+        query = query.filter(tuple_(*sort_keys) > tuple_(*after))
+    query = query.order_by(*sort_keys)
+    if paginate:
+        query = query.limit(limit + 1)
+
+    rows = query.all()
+    next_cursor = None
+    if paginate and len(rows) > limit:
+        rows = rows[:limit]
+        last = rows[-1]
+        next_cursor = encode_cursor(getattr(last, f'_sort_{i}') for i in range(len(sort_keys)))
+
+    vehicles = serializer.many(rows)
+
+    if not paginate:
+        return jsonify(vehicles), 200
+    return jsonify({'vehicles': vehicles, 'next_cursor': next_cursor}), 200
 
 
 # ✅ Public: Get vehicle by ID
 @vehicle_bp.route('/<int:vehicle_id>', methods=['GET'])
+@cached_response('catalog')
 def get_vehicle(vehicle_id):
-    vehicle = Vehicle.query.get(vehicle_id)
+    serializer = vehicle_serializer()
+    vehicle = db.session.query(*serializer.columns).select_from(Vehicle) \
+        .outerjoin(Category).filter(Vehicle.id == vehicle_id).first()
     if not vehicle:
         return jsonify({'error': 'Vehicle not found'}), 404
 
-    return jsonify({
-        'id': vehicle.id,
-        'name': vehicle.name,
-        'description': vehicle.description,
-        'price': vehicle.price,
-        'availability': vehicle.availability,
-        'category': vehicle.category.name if vehicle.category else None,
-        'image_url': vehicle.image_url if vehicle.image_url else None  # Ensure image_url is returned
-    }), 200
+    return jsonify(serializer(vehicle)), 200
 
 
 # ✅ Admin: Add a new vehicle
 @vehicle_bp.route('/', methods=['POST'])
-@jwt_required()
+@admin_required
 def add_vehicle():
-    user_id = get_jwt_identity()
-    user = User.query.get(user_id)
-
-    if not user or not user.is_admin:
-        return jsonify({'error': 'Admins only'}), 403
-
     data = request.get_json()
     required_fields = ['name', 'description', 'price', 'category_id']
 
@@ -92,6 +154,7 @@ def add_vehicle():
     )
     db.session.add(vehicle)
     db.session.commit()
+    bump_version('catalog')
     return jsonify({
         'message': 'Vehicle added successfully',
         'vehicle': {
@@ -104,14 +167,8 @@ def add_vehicle():
 
 # ✅ Admin: Update a vehicle
 @vehicle_bp.route('/<int:vehicle_id>', methods=['PATCH'])
-@jwt_required()
+@admin_required
 def update_vehicle(vehicle_id):
-    user_id = get_jwt_identity()
-    user = User.query.get(user_id)
-
-    if not user or not user.is_admin:
-        return jsonify({'error': 'Admins only'}), 403
-
     vehicle = Vehicle.query.get(vehicle_id)
     if not vehicle:
         return jsonify({'error': 'Vehicle not found'}), 404
@@ -130,6 +187,7 @@ def update_vehicle(vehicle_id):
     vehicle.image_url = data.get('image_url', vehicle.image_url)  # Update image URL
 
     db.session.commit()
+    bump_version('catalog')
     return jsonify({
         'message': 'Vehicle updated successfully',
         'vehicle': {
@@ -142,18 +200,187 @@ def update_vehicle(vehicle_id):
 
 # ✅ Admin: Delete a vehicle
 @vehicle_bp.route('/<int:vehicle_id>', methods=['DELETE'])
-@jwt_required()
+@admin_required
 def delete_vehicle(vehicle_id):
-    user_id = get_jwt_identity()
-    user = User.query.get(user_id)
-
-    if not user or not user.is_admin:
-        return jsonify({'error': 'Admins only'}), 403
-
     vehicle = Vehicle.query.get(vehicle_id)
     if not vehicle:
         return jsonify({'error': 'Vehicle not found'}), 404
 
     db.session.delete(vehicle)
     db.session.commit()
-    return jsonify({'message': 'Vehicle deleted'}), 200
\ No newline at end of file
+    bump_version('catalog')
+    return jsonify({'message': 'Vehicle deleted'}), 200
+
+
+# Rows per INSERT ... ON CONFLICT statement (and per commit) in the bulk sync
+VEHICLE_UPSERT_CHUNK = 1000
+
+# Columns a bulk row overwrites: each row is the full record, so optional
+# fields left out are reset to their defaults
+UPSERT_COLUMNS = (
+    'name', 'description', 'price', 'availability', 'image_url', 'image_urls',
+    'features', 'seats', 'transmission', 'fuel_type', 'category_id'
+)
+
+UPSERT_INSERTS = {'postgresql': postgresql_insert, 'sqlite': sqlite_insert}
+
+
+def read_bulk_items():
+    """Yield (index, item) from an NDJSON body (line by line) or a JSON array; None if the body is neither."""
+    if request.mimetype == 'application/x-ndjson':
+        def lines():
+            for index, line in enumerate(request.stream):
+                if not line.strip():
+                    continue
+                try:
+                    yield index, json.loads(line)
+                except ValueError:
+                    yield index, None
+        return lines()
+
+    data = request.get_json(silent=True)
+    if isinstance(data, dict):
+        data = data.get('vehicles')
+    if not isinstance(data, list):
+        return None
+    return enumerate(data)
+
+
+def is_number(value):
+    return isinstance(value, (int, float)) and not isinstance(value, bool)
+
+
+def bulk_vehicle_values(item, category_ids):
+    """Validate one bulk row; returns (values, None) or (None, error message)."""
+    if not isinstance(item, dict):
+        return None, 'Row must be a JSON object'
+    external_id = item.get('external_id')
+    if not isinstance(external_id, str) or not external_id.strip():
+        return None, 'external_id must be a non-empty string'
+    for field in ('name', 'description'):
+        if not isinstance(item.get(field), str) or not item[field].strip():
+            return None, f'{field} is required'
+    if not is_number(item.get('price')) or item['price'] < 0:
+        return None, 'price must be a non-negative number'
+    if not isinstance(item.get('availability', True), bool):
+        return None, 'availability must be a boolean'
+    if item.get('seats') is not None and (not isinstance(item['seats'], int) or isinstance(item['seats'], bool)):
+        return None, 'seats must be an integer'
+    for field in ('image_url', 'transmission', 'fuel_type'):
+        if item.get(field) is not None and not isinstance(item[field], str):
+            return None, f'{field} must be a string'
+    # Postgres rejects over-long strings, which would otherwise fail the whole chunk
+    for field in ('external_id', 'name', 'image_url', 'transmission', 'fuel_type'):
+        length = Vehicle.__table__.c[field].type.length
+        if item.get(field) is not None and len(item[field]) > length:
+            return None, f'{field} must be at most {length} characters'
+
+    category = item.get('category')
+    if not isinstance(category, str) or category.lower() not in category_ids:
+        return None, f'Unknown category: {category}'
+
+    return {
+        'external_id': external_id,
+        'name': item['name'],
+        'description': item['description'],
+        'price': float(item['price']),
+        'availability': item.get('availability', True),
+        'image_url': item.get('image_url'),
+        'image_urls': item.get('image_urls'),
+        'features': item.get('features'),
+        'seats': item.get('seats'),
+        'transmission': item.get('transmission'),
+        'fuel_type': item.get('fuel_type'),
+        'category_id': category_ids[category.lower()]
+    }, None
+
+
+def upsert_vehicle_chunk(rows):
+    """INSERT ... ON CONFLICT (external_id) DO UPDATE one chunk and commit; returns how many already existed."""
+    external_ids = [row['external_id'] for row in rows]
+    existing = db.session.query(func.count(Vehicle.id)).filter(Vehicle.external_id.in_(external_ids)).scalar()
+
+    insert = UPSERT_INSERTS[db.session.get_bind().dialect.name]
+    statement = insert(Vehicle)
+    statement = statement.on_conflict_do_update(
+        index_elements=[Vehicle.external_id],
+        set_={column: statement.excluded[column] for column in UPSERT_COLUMNS}
+    )
+    db.session.execute(statement, rows)
+    db.session.commit()
+    return existing
+
+
+# ✅ Admin: Create or update vehicles in bulk, keyed by the fleet system's external_id
+@vehicle_bp.route('/bulk', methods=['POST'])
+@admin_required
+def bulk_upsert_vehicles():
+    """Upsert a JSON array (or {"vehicles": [...]}) or an NDJSON stream of vehicles.
+
+    Rows name their category by `category` (case-insensitive). Valid rows are
+    written in chunks of VEHICLE_UPSERT_CHUNK, each in its own transaction. A
+    chunk the database rejects is bisected and retried, so only the rows it
+    actually refuses fail; those and invalid rows are reported in `errors` by
+    their position in the input.
+    """
+    if db.session.get_bind().dialect.name not in UPSERT_INSERTS:
+        return jsonify({'error': 'Bulk upsert is not supported on this database'}), 501
+
+    items = read_bulk_items()
+    if items is None:
+        return jsonify({'error': 'Body must be a JSON array of vehicles or NDJSON'}), 400
+
+    # Categories are few: resolve every name with one query up front
+    category_ids = {name.lower(): category_id for category_id, name in db.session.query(Category.id, Category.name)}
+    db.session.commit()
+
+    counts = {'created': 0, 'updated': 0}
+    errors = []
+    seen = set()
+    chunk = []
+
+    def write(rows):
+        # A rejected batch is split in half and retried until the offending rows stand alone
+        try:
+            existing = upsert_vehicle_chunk([values for _, values in rows])
+        except SQLAlchemyError as e:
+            db.session.rollback()
+            if len(rows) == 1:
+                index, values = rows[0]
+                logger.error(f"Bulk vehicle row {index} rejected: {str(e)}")
+                errors.append({'index': index, 'external_id': values['external_id'], 'error': 'Database rejected this row'})
+                return
+            middle = len(rows) // 2
+            write(rows[:middle])
+            write(rows[middle:])
+            return
+        counts['updated'] += existing
+        counts['created'] += len(rows) - existing
+
+    def flush():
+        write(list(chunk))
+        chunk.clear()
+
+    for index, item in items:
+        values, error = bulk_vehicle_values(item, category_ids) if item is not None else (None, 'Invalid JSON')
+        if values is not None and values['external_id'] in seen:
+            values, error = None, 'Duplicate external_id in this request'
+        if error:
+            external_id = item.get('external_id') if isinstance(item, dict) else None
+            errors.append({'index': index, 'external_id': external_id, 'error': error})
+            continue
+        seen.add(values['external_id'])
+        chunk.append((index, values))
+        if len(chunk) >= VEHICLE_UPSERT_CHUNK:
+            flush()
+    if chunk:
+        flush()
+
+    if counts['created'] or counts['updated']:
+        bump_version('catalog')
+    return jsonify({
+        'created': counts['created'],
+        'updated': counts['updated'],
+        'failed': len(errors),
+        'errors': errors
+    }), 200